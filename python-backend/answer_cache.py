@@ -0,0 +1,88 @@
+"""Semantic cache of chatbot answers keyed by query embedding.
+
+A question whose embedding is within `threshold` cosine similarity of an
+earlier one gets the earlier answer back without calling the LLM. Entries
+are held in a small exact inner-product FAISS index and expire after a TTL
+or in LRU order once the cache is full. Each answer is tied to the corpus
+version it was generated from, so ingesting new chunks invalidates it.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import faiss
+import numpy as np
+
+# Candidates scanned per lookup, so a few expired or stale neighbours do not hide a live one
+LOOKUP_CANDIDATES = 4
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold=0.92, max_entries=1000, ttl_seconds=3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._index = None
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _prepare(vector):
+        vector = np.array(vector, dtype=np.float32, copy=True).reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _remove(self, entry_id):
+        del self._entries[entry_id]
+        self._index.remove_ids(np.array([entry_id], dtype=np.int64))
+
+    def lookup(self, query_vector, version=None):
+        """Cached answer for a near-identical earlier query, or None."""
+        with self._lock:
+            if self._index is None or not self._entries:
+                self.misses += 1
+                return None
+            now = time.monotonic()
+            scores, ids = self._index.search(self._prepare(query_vector), min(LOOKUP_CANDIDATES, len(self._entries)))
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id < 0 or score < self.threshold:
+                    break
+                answer, entry_version, stored_at = self._entries[entry_id]
+                if (self.ttl_seconds and now - stored_at > self.ttl_seconds) or entry_version != version:
+                    self._remove(entry_id)
+                    continue
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                return answer
+            self.misses += 1
+            return None
+
+    def put(self, query_vector, answer, version=None):
+        vector = self._prepare(query_vector)
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+            self._entries[entry_id] = (answer, version, time.monotonic())
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,162 @@
+"""Versioned on-disk store for the RAG embeddings and FAISS index.
+
+Artifacts live under ARTIFACT_DIR together with a manifest recording the
+format version, the SHA-256 of the chunk file and the encoder name. Workers
+load the embeddings memory-mapped and the index with faiss.read_index, and
+only re-encode the corpus when the manifest no longer matches.
+
+The chunk texts themselves are stored next to them as a ChunkStore (see
+chunker.py), re-chunked only when the source file or chunking spec changes.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import faiss
+import numpy as np
+
+from chunker import ChunkStore
+
+ARTIFACT_VERSION = 3
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "artifacts")
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write_fn):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    write_fn(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class ArtifactStore:
+    def __init__(self, root=ARTIFACT_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.last_load = {}
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def expected_manifest(self, chunks_path, model_name, index_spec=None):
+        return {
+            "version": ARTIFACT_VERSION,
+            "chunks_sha256": file_sha256(chunks_path),
+            "model_name": model_name,
+            "index_spec": index_spec,
+        }
+
+    def read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _is_current(self, expected):
+        manifest = self.read_manifest()
+        if manifest is None:
+            return False
+        if any(manifest.get(key) != value for key, value in expected.items()):
+            return False
+        return os.path.exists(self.path("embeddings.npy")) and os.path.exists(self.path("faiss_index.bin"))
+
+    def _open(self):
+        embeddings = np.load(self.path("embeddings.npy"), mmap_mode="r")
+        # Read into memory, not mmap-ed: LiveCorpus adds and removes vectors, and
+        # mmap-ed IVF inverted lists are read-only
+        index = faiss.read_index(self.path("faiss_index.bin"))
+        return embeddings, index
+
+    def _write(self, embeddings, index, manifest):
+        os.makedirs(self.root, exist_ok=True)
+        manifest = dict(manifest, num_vectors=int(index.ntotal), dim=int(index.d), built_at=time.time())
+
+        def save_embeddings(path):
+            # np.save appends ".npy" to bare paths, so hand it a file object
+            with open(path, "wb") as f:
+                np.save(f, np.ascontiguousarray(embeddings, dtype=np.float32))
+
+        def save_manifest(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+
+        _atomic_write(self.path("embeddings.npy"), save_embeddings)
+        _atomic_write(self.path("faiss_index.bin"), lambda path: faiss.write_index(index, path))
+        _atomic_write(self.manifest_path, save_manifest)
+
+    def _lock(self):
+        os.makedirs(self.root, exist_ok=True)
+        return open(self.path(".lock"), "w")
+
+    @contextmanager
+    def locked(self):
+        """Hold the store's exclusive lock, e.g. to build another artifact once across workers."""
+        with self._lock() as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def load_chunks(self, source_path, chunk_spec, build_chunks):
+        """Return the ChunkStore for `source_path`, calling `build_chunks()` only when stale."""
+        prefix = self.path("chunks")
+        manifest_path = self.path("chunks.json")
+        expected = {"version": ARTIFACT_VERSION, "source_sha256": file_sha256(source_path), "chunk_spec": chunk_spec}
+
+        def is_current():
+            if not (os.path.exists(manifest_path) and ChunkStore.exists(prefix)):
+                return False
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f) == expected
+
+        if not is_current():
+            with self._lock() as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                if not is_current():
+                    ChunkStore.build(build_chunks()).save(prefix, _atomic_write)
+
+                    def save_manifest(path):
+                        with open(path, "w", encoding="utf-8") as f:
+                            json.dump(expected, f, indent=2)
+
+                    _atomic_write(manifest_path, save_manifest)
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return ChunkStore.load(prefix)
+
+    def load_or_build(self, chunks_path, chunks, model, model_name, build_index, index_spec=None):
+        """Return (embeddings, index), rebuilding only when the manifest is stale.
+
+        `build_index(embeddings)` constructs a FAISS index from float32 vectors;
+        `index_spec` describes it so a change of index type forces a rebuild.
+        """
+        start = time.perf_counter()
+        expected = self.expected_manifest(chunks_path, model_name, index_spec)
+        if self._is_current(expected):
+            embeddings, index = self._open()
+            self.last_load = {"source": "cache", "seconds": time.perf_counter() - start}
+            return embeddings, index
+
+        # Serialize rebuilds so concurrent uvicorn workers encode the corpus once
+        with self._lock() as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            source = "cache"
+            if not self._is_current(expected):
+                embeddings = model.encode(list(chunks), convert_to_numpy=True).astype(np.float32)
+                source = "rebuild"
+                index = build_index(embeddings)
+                self._write(embeddings, index, expected)
+            embeddings, index = self._open()
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+        self.last_load = {"source": source, "seconds": time.perf_counter() - start}
+        return embeddings, index
@@ -0,0 +1,217 @@
+"""Persistent career clusters over binary resume skill vectors.
+
+Centroids are trained offline with MiniBatchKMeans on the whole population
+of extracted skill vectors and saved to CAREER_MODEL_FILE; a request only
+assigns each resume to its nearest centroid (O(k*d)), so cluster ids mean
+the same thing across requests. Each centroid is labelled with the career
+profile (career_profiles.json) whose skills it weights most.
+
+Until a model has been trained, each career profile is a centroid and a
+resume goes to the profile holding the largest share of its skills, ties to
+the profile listed first (the order the old if/elif chain checked them in);
+a resume with none of the profiles' skills is a generalist. Nearest-centroid
+distance would favour the profiles with the fewest skills here.
+With CAREER_MODEL_ONLINE=1 a worker also folds each new resume into its
+trained centroid in memory with the MiniBatchKMeans per-sample update (the
+cold-start profiles stay fixed). With CAREER_POPULATION_LOG=1 every request also appends its skill sets (no file
+names or text) to the population log that offline training reads, so those
+updates are persisted by the next training. The log is not rotated; truncate
+it after training if it is left on.
+
+CLI:
+    python career_model.py train [--k 6] [--resumes DIR]
+    python career_model.py show
+"""
+import argparse
+import fcntl
+import json
+import os
+import threading
+
+import numpy as np
+
+from artifacts import _atomic_write
+from skill_vocab import SkillVocabulary
+
+GENERALIST = "Generalist / Software Engineer"
+
+
+def load_profiles(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def label_centroids(centroids, skills, profiles, min_weight=0.2):
+    """Career name per centroid: the profile with the highest mean weight on its skills."""
+    vocab = SkillVocabulary(skills)
+    labels = []
+    for centroid in centroids:
+        best, best_weight = GENERALIST, min_weight
+        for profile in profiles:
+            cols = vocab.ids(profile["skills"])
+            weight = float(centroid[cols].mean()) if len(cols) else 0.0
+            if weight > best_weight:
+                best, best_weight = profile["career"], weight
+        labels.append(best)
+    return labels
+
+
+class CareerModel:
+    def __init__(self, skills, centroids, counts, careers, metric="euclidean"):
+        # "euclidean" for trained KMeans centroids, "overlap" for cold-start profiles
+        self.skills = list(skills)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.careers = list(careers)
+        self.metric = metric
+        self._sq_norms = (self.centroids ** 2).sum(axis=1)
+        self._lock = threading.Lock()
+        self.updates = 0
+
+    @classmethod
+    def from_profiles(cls, skills, profiles):
+        """Cold-start model: one binary centroid per profile, plus a generalist at the origin."""
+        vocab = SkillVocabulary(skills)
+        centroids, careers = [], []
+        for profile in profiles:
+            centroid = vocab.encode([profile["skills"]]).toarray()[0]
+            # A profile with no skills in the vocabulary would sit on the generalist centroid
+            if centroid.any():
+                centroids.append(centroid)
+                careers.append(profile["career"])
+        centroids.append(np.zeros(len(skills), dtype=np.float32))
+        careers.append(GENERALIST)
+        return cls(skills, np.stack(centroids), np.zeros(len(careers)), careers, metric="overlap")
+
+    @classmethod
+    def train(cls, X, skills, profiles, k=6, batch_size=256, random_state=42):
+        from sklearn.cluster import MiniBatchKMeans
+        k = min(k, X.shape[0])
+        kmeans = MiniBatchKMeans(n_clusters=k, batch_size=batch_size, random_state=random_state, n_init=3)
+        labels = kmeans.fit_predict(X)
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        counts = np.bincount(labels, minlength=k)
+        return cls(skills, centroids, counts, label_centroids(centroids, skills, profiles))
+
+    def columns(self, vocab):
+        """Ids of the model's skills in a shared SkillVocabulary, in centroid column order."""
+        return np.array([vocab.add(skill) for skill in self.skills], dtype=np.int64)
+
+    def select(self, X, vocab):
+        """Restrict CSR rows over `vocab` to the model's skills, in centroid column order."""
+        columns = self.columns(vocab)
+        return vocab.resize(X)[:, columns]
+
+    def predict(self, X):
+        """Centroid per row of X (dense or CSR, in centroid column order)."""
+        products = np.asarray(X @ self.centroids.T)
+        if self.metric == "overlap":
+            # x.c counts the resume's skills in each profile; argmax keeps the first on ties
+            labels = np.argmax(products, axis=1)
+            labels[products.max(axis=1) <= 0] = self.careers.index(GENERALIST)
+            return labels
+        # argmin ||x - c||^2 = argmin (||c||^2 - 2 x.c); ||x||^2 is the same for every centroid
+        return np.argmin(self._sq_norms[None, :] - 2.0 * products, axis=1)
+
+    def partial_fit(self, X, labels):
+        """Move each assigned centroid towards its new points (per-sample MiniBatchKMeans step)."""
+        if self.metric == "overlap":
+            # Cold-start profiles are fixed skill sets with no samples behind them; the first
+            # resume would replace a centroid outright, so only trained models learn online
+            return
+        X = X.toarray() if hasattr(X, "toarray") else X
+        with self._lock:
+            for x, label in zip(X, labels):
+                self.counts[label] += 1
+                self.centroids[label] += (x - self.centroids[label]) / self.counts[label]
+            self._sq_norms = (self.centroids ** 2).sum(axis=1)
+            self.updates += X.shape[0]
+
+    def relabel(self, profiles):
+        self.careers = label_centroids(self.centroids, self.skills, profiles)
+
+    def save(self, path):
+        def write(tmp_path):
+            # np.savez appends ".npz" to bare paths, so hand it a file object
+            with open(tmp_path, "wb") as f:
+                np.savez(f, skills=np.array(self.skills), centroids=self.centroids,
+                         counts=self.counts, careers=np.array(self.careers), metric=np.array(self.metric))
+
+        with self._lock:
+            _atomic_write(path, write)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            metric = str(data["metric"]) if "metric" in data else "euclidean"
+            return cls(data["skills"].tolist(), data["centroids"], data["counts"], data["careers"].tolist(), metric)
+
+    def stats(self):
+        return {
+            "clusters": [
+                {"cluster": i, "career": career, "count": int(count)}
+                for i, (career, count) in enumerate(zip(self.careers, self.counts))
+            ],
+            "dimensions": len(self.skills),
+            "online_updates": self.updates,
+        }
+
+
+def append_population(path, skill_sets):
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        for skill_set in skill_sets:
+            f.write(json.dumps(sorted(skill_set)) + "\n")
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_population(path):
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or inspect the persistent career clusters.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train")
+    train.add_argument("--k", type=int, default=6)
+    train.add_argument("--resumes", help="Directory of resume PDFs to train on alongside the population log.")
+    sub.add_parser("show")
+    args = parser.parse_args()
+
+    import main as app_main
+    if args.command == "show":
+        print(json.dumps(app_main.career_model.get().stats(), indent=2))
+        return
+
+    population = read_population(app_main.CAREER_POPULATION_FILE)
+    if args.resumes:
+        from documents import extract_text_from_pdf
+        paths = sorted(os.path.join(args.resumes, n) for n in os.listdir(args.resumes) if n.lower().endswith(".pdf"))
+        texts = []
+        for path in paths:
+            with open(path, "rb") as f:
+                texts.append(extract_text_from_pdf(f.read()))
+        matrix = app_main.extract_skill_matrix(texts)
+        skill_names = app_main.skill_index.get().skills
+        population += [[skill_names[j] for j in np.flatnonzero(row)] for row in matrix]
+    if not population:
+        raise SystemExit("No skill vectors to train on; pass --resumes or serve /suggest-career with CAREER_POPULATION_LOG=1.")
+
+    skills = sorted(app_main.known_skills)
+    profiles = load_profiles(app_main.CAREER_PROFILES_FILE)
+    # MiniBatchKMeans takes the CSR rows directly
+    vocab = SkillVocabulary(skills)
+    model = CareerModel.train(vocab.encode(population), skills, profiles, k=args.k)
+    model.save(app_main.CAREER_MODEL_FILE)
+    print(f"Trained {len(model.careers)} clusters on {len(population)} resumes -> {app_main.CAREER_MODEL_FILE}")
+    print(json.dumps(model.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Chunking of RAG source documents and a compact on-disk chunk store.
+
+Documents are split into windows of at most CHUNK_MAX_TOKENS encoder tokens
+with CHUNK_OVERLAP tokens shared between neighbouring windows, so no chunk is
+silently truncated by the encoder's max_seq_length. Identical chunks are
+dropped by digest.
+
+The ChunkStore keeps all chunk texts in one UTF-8 blob plus an offsets array
+(and one 16-byte digest per chunk); both are memory-mapped when loaded, so a
+worker does not hold a Python string per chunk.
+"""
+import ast
+import hashlib
+import os
+import re
+
+import numpy as np
+
+DIGEST_BYTES = 16
+WORD_RE = re.compile(r"\S+")
+
+
+def chunk_spec_from_env(tokenizer_name=None):
+    return {
+        "max_tokens": int(os.getenv("CHUNK_MAX_TOKENS", "200")),
+        "overlap": int(os.getenv("CHUNK_OVERLAP", "40")),
+        "tokenizer": tokenizer_name,
+    }
+
+
+def chunk_digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=DIGEST_BYTES).digest()
+
+
+def parse_documents(text):
+    """Split a source file into documents.
+
+    text_chunks.txt is a Python list repr of strings; anything else is split
+    on blank lines.
+    """
+    stripped = text.strip()
+    if stripped.startswith("["):
+        try:
+            documents = ast.literal_eval(stripped)
+        except (ValueError, SyntaxError):
+            documents = None
+        if isinstance(documents, list) and all(isinstance(d, str) for d in documents):
+            return [d.strip() for d in documents if d.strip()]
+    return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+def token_spans(text, tokenizer=None):
+    """(start, end) character span of every token in `text`.
+
+    Uses the encoder's fast tokenizer offsets when available, otherwise
+    whitespace-separated words.
+    """
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+            return [tuple(span) for span in encoded["offset_mapping"]]
+        except (TypeError, NotImplementedError, KeyError):
+            pass
+    return [m.span() for m in WORD_RE.finditer(text)]
+
+
+def split_document(text, max_tokens, overlap, tokenizer=None):
+    spans = token_spans(text, tokenizer)
+    if len(spans) <= max_tokens:
+        return [text]
+    stride = max(1, max_tokens - overlap)
+    windows = []
+    for start in range(0, len(spans), stride):
+        window = spans[start:start + max_tokens]
+        windows.append(text[window[0][0]:window[-1][1]].strip())
+        if start + max_tokens >= len(spans):
+            break
+    return windows
+
+
+def chunk_documents(documents, spec, tokenizer=None):
+    chunks = []
+    for document in documents:
+        chunks.extend(split_document(document, spec["max_tokens"], spec["overlap"], tokenizer))
+    return chunks
+
+
+class ChunkStore:
+    def __init__(self, blob, offsets, digests):
+        self._blob = blob
+        self._offsets = offsets
+        self.digests = digests
+
+    @classmethod
+    def build(cls, texts):
+        """Pack texts into a store, dropping exact duplicates (first one wins)."""
+        seen = set()
+        encoded, digests = [], []
+        for text in texts:
+            digest = chunk_digest(text)
+            if digest in seen:
+                continue
+            seen.add(digest)
+            encoded.append(text.encode("utf-8"))
+            digests.append(digest)
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        digests = np.frombuffer(b"".join(digests), dtype=np.uint8).reshape(-1, DIGEST_BYTES)
+        return cls(blob, offsets, digests)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def digest(self, i):
+        return self.digests[i].tobytes()
+
+    def nbytes(self):
+        return int(self._blob.nbytes + self._offsets.nbytes + self.digests.nbytes)
+
+    @staticmethod
+    def paths(prefix):
+        return f"{prefix}.bin", f"{prefix}.offsets.npy", f"{prefix}.digests.npy"
+
+    def save(self, prefix, atomic_write):
+        blob_path, offsets_path, digests_path = self.paths(prefix)
+
+        def save_array(array):
+            def write(path):
+                with open(path, "wb") as f:
+                    np.save(f, np.ascontiguousarray(array))
+            return write
+
+        def save_blob(path):
+            with open(path, "wb") as f:
+                f.write(self._blob.tobytes())
+
+        atomic_write(blob_path, save_blob)
+        atomic_write(offsets_path, save_array(self._offsets))
+        atomic_write(digests_path, save_array(self.digests))
+
+    @classmethod
+    def load(cls, prefix):
+        blob_path, offsets_path, digests_path = cls.paths(prefix)
+        # np.memmap cannot map an empty file
+        if os.path.getsize(blob_path):
+            blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+        else:
+            blob = np.zeros(0, dtype=np.uint8)
+        return cls(blob, np.load(offsets_path, mmap_mode="r"), np.load(digests_path, mmap_mode="r"))
+
+    @classmethod
+    def exists(cls, prefix):
+        return all(os.path.exists(path) for path in cls.paths(prefix))
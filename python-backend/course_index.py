@@ -0,0 +1,152 @@
+"""Precomputed course-skill embeddings for career path recommendations.
+
+Every unique skill string in Coursera.csv is encoded once and kept as a single
+L2-normalized float32 matrix. Courses point into that matrix through a CSR-style
+(offsets, skill_ids) pair, so scoring all courses against a role is one matrix
+product followed by a segmented max over each course's rows.
+
+The saved index records the SHA-256 of the CSV it was built from, so an
+edited Coursera.csv is re-encoded even when its row count is unchanged.
+
+Build offline with:
+    python course_index.py Coursera.csv artifacts/course_skill_index.npz
+"""
+import os
+import sys
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from artifacts import ARTIFACT_DIR, _atomic_write, file_sha256
+from model_registry import DEFAULT_MODEL
+from vector_utils import normalize_rows
+
+
+def parse_course_skills(raw):
+    # Coursera.csv stores skills as a set literal: {" Network Security"," Linux"}
+    if raw is None or (isinstance(raw, float) and np.isnan(raw)):
+        return []
+    text = str(raw).strip().strip("{}")
+    skills = []
+    for part in text.split(","):
+        skill = part.strip().strip('"').strip()
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills
+
+
+class CourseSkillIndex:
+    def __init__(self, skills, skill_embeddings, skill_ids, offsets, model_name=DEFAULT_MODEL, source_sha256=""):
+        self.skills = list(skills)
+        self.skill_embeddings = np.ascontiguousarray(skill_embeddings, dtype=np.float32)
+        self.skill_ids = np.asarray(skill_ids, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.model_name = model_name
+        self.source_sha256 = source_sha256
+
+        # reduceat cannot express empty segments, so remember which courses have skills
+        self._nonempty = self.offsets[1:] > self.offsets[:-1]
+        self._starts = self.offsets[:-1][self._nonempty]
+
+    @property
+    def num_courses(self):
+        return len(self.offsets) - 1
+
+    @classmethod
+    def build(cls, coursera_df, model, model_name=DEFAULT_MODEL, batch_size=256, source_sha256=""):
+        skill_to_id = {}
+        skill_ids = []
+        offsets = [0]
+        for raw in coursera_df["skills"]:
+            for skill in parse_course_skills(raw):
+                key = skill.lower()
+                if key not in skill_to_id:
+                    skill_to_id[key] = len(skill_to_id)
+                skill_ids.append(skill_to_id[key])
+            offsets.append(len(skill_ids))
+
+        skills = list(skill_to_id)
+        if skills:
+            embeddings = model.encode(skills, batch_size=batch_size, convert_to_numpy=True)
+        else:
+            embeddings = np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+        return cls(skills, normalize_rows(embeddings), skill_ids, offsets, model_name, source_sha256)
+
+    def save(self, path):
+        # np.savez appends ".npz" to bare paths, so hand it a file object
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                skills=np.array(self.skills, dtype=object),
+                skill_embeddings=self.skill_embeddings,
+                skill_ids=self.skill_ids,
+                offsets=self.offsets,
+                model_name=np.array(self.model_name),
+                source_sha256=np.array(self.source_sha256),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=True) as data:
+            return cls(
+                data["skills"].tolist(),
+                data["skill_embeddings"],
+                data["skill_ids"],
+                data["offsets"],
+                str(data["model_name"]),
+                str(data["source_sha256"]) if "source_sha256" in data else "",
+            )
+
+    @classmethod
+    def load_or_build(cls, coursera_df, model, path=None, model_name=DEFAULT_MODEL, source_path=None, lock=None):
+        """Load the index at `path` unless it is stale, else build and save it.
+
+        `lock` is a context manager factory (e.g. ArtifactStore.locked) so that
+        concurrent workers build the index once.
+        """
+        source_sha256 = file_sha256(source_path) if source_path else ""
+
+        def load_current():
+            if not (path and os.path.exists(path)):
+                return None
+            index = cls.load(path)
+            if (index.model_name == model_name and index.num_courses == len(coursera_df)
+                    and index.source_sha256 == source_sha256):
+                return index
+            return None
+
+        index = load_current()
+        if index is not None:
+            return index
+        with lock() if lock else nullcontext():
+            index = load_current()
+            if index is None:
+                index = cls.build(coursera_df, model, model_name, source_sha256=source_sha256)
+                if path:
+                    _atomic_write(path, index.save)
+        return index
+
+    def max_similarity(self, role_skill_embeddings):
+        """Best cosine similarity between any role skill and any skill of each course.
+
+        Courses without skills score -1.
+        """
+        role = normalize_rows(np.atleast_2d(role_skill_embeddings))
+        best_per_skill = (self.skill_embeddings @ role.T).max(axis=1)
+        scores = np.full(self.num_courses, -1.0, dtype=np.float32)
+        if len(self._starts):
+            scores[self._nonempty] = np.maximum.reduceat(best_per_skill[self.skill_ids], self._starts)
+        return scores
+
+
+if __name__ == "__main__":
+    from sentence_transformers import SentenceTransformer
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "Coursera.csv"
+    out_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(ARTIFACT_DIR, "course_skill_index.npz")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    index = CourseSkillIndex.build(pd.read_csv(csv_path), SentenceTransformer(DEFAULT_MODEL),
+                                   source_sha256=file_sha256(csv_path))
+    _atomic_write(out_path, index.save)
+    print(f"Indexed {len(index.skills)} unique skills across {index.num_courses} courses -> {out_path}")
@@ -0,0 +1,32 @@
+"""Cheap change detection for the CSV files the API serves from memory.
+
+The file is only re-hashed when its mtime or size moves, so polling on every
+request costs one stat() call.
+"""
+import os
+import threading
+
+from artifacts import file_sha256
+
+
+class FileVersion:
+    def __init__(self, path):
+        self.path = path
+        self._stat_key = None
+        self.digest = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Return True when the file content changed since the last call."""
+        st = os.stat(self.path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if stat_key == self._stat_key:
+            return False
+        with self._lock:
+            if stat_key == self._stat_key:
+                return False
+            digest = file_sha256(self.path)
+            changed = digest != self.digest
+            self._stat_key = stat_key
+            self.digest = digest
+            return changed
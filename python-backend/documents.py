@@ -0,0 +1,69 @@
+"""Text extraction from uploaded PDFs.
+
+Kept free of the API's heavy state so process-pool workers can import it
+cheaply. Image OCR lives in ocr_engine.py.
+"""
+import io
+import os
+
+import pdfplumber
+
+# Upper bounds on work per uploaded PDF
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "30"))
+MAX_PDF_CHARS = int(os.getenv("MAX_PDF_CHARS", "100000"))
+# Rendering resolution for PDF pages that have to be OCR'd
+PDF_OCR_DPI = int(os.getenv("PDF_OCR_DPI", "150"))
+
+def _page_texts(pdf, start, max_pages, max_chars, keep_empty=False):
+    remaining = max_chars
+    for page in pdf.pages[start:start + max_pages]:
+        if remaining <= 0:
+            break
+        text = page.extract_text()
+        # Drop the parsed layout objects as soon as the page is done
+        page.close()
+        if text and text.strip():
+            text = text[:remaining]
+            remaining -= len(text)
+            yield text
+        elif keep_empty:
+            yield ""
+
+
+def iter_pdf_pages(file_bytes, start=0, max_pages=MAX_PDF_PAGES, max_chars=MAX_PDF_CHARS):
+    """Yield page texts from `start`, stopping at the page or character budget.
+
+    Pages without a text layer are skipped; the page that crosses the
+    character budget is truncated to it.
+    """
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        yield from _page_texts(pdf, start, max_pages, max_chars)
+
+
+def extract_pdf_pages(file_bytes, start=0, max_pages=MAX_PDF_PAGES, max_chars=MAX_PDF_CHARS):
+    """(page texts, total page count) for one slice of the document."""
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        return list(_page_texts(pdf, start, max_pages, max_chars)), len(pdf.pages)
+
+
+def extract_text_from_pdf(file_bytes, max_pages=MAX_PDF_PAGES, max_chars=MAX_PDF_CHARS):
+    return "\n".join(iter_pdf_pages(file_bytes, 0, max_pages, max_chars)).strip()
+
+
+def pdf_text_layer(file_bytes, max_pages=MAX_PDF_PAGES, max_chars=MAX_PDF_CHARS):
+    """Embedded text of each page, "" for pages without a text layer (e.g. scans)."""
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        return list(_page_texts(pdf, 0, max_pages, max_chars, keep_empty=True))
+
+
+def rasterize_pdf_pages(file_bytes, page_numbers, resolution=PDF_OCR_DPI):
+    """PNG bytes of the given (0-based) pages, for OCR."""
+    images = []
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        for number in page_numbers:
+            page = pdf.pages[number]
+            buffer = io.BytesIO()
+            page.to_image(resolution=resolution).original.save(buffer, format="PNG")
+            page.close()
+            images.append(buffer.getvalue())
+    return images
@@ -0,0 +1,92 @@
+"""Bounded LRU/TTL cache of phrase embeddings in front of the shared encoder.
+
+Keys are (model name, normalized phrase). A lookup encodes only the misses,
+deduplicated, in a single batch and keeps hit/miss counters for tuning.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_phrase(text):
+    # The MiniLM encoder is uncased, so case folding does not change embeddings
+    return _WHITESPACE.sub(" ", str(text)).strip().lower()
+
+
+class EmbeddingCache:
+    def __init__(self, get_model, model_name, max_entries=50000, ttl_seconds=24 * 3600):
+        self._get_model = get_model
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.encode_batches = 0
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        vector, stored_at = entry
+        if self.ttl_seconds and now - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return vector
+
+    def encode(self, texts, batch_size=64):
+        """Embeddings for texts as a float32 array, in input order."""
+        keys = [(self.model_name, normalize_phrase(t)) for t in texts]
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                if key not in found:
+                    vector = self._lookup(key, now)
+                    if vector is not None:
+                        found[key] = vector
+            missing = list(dict.fromkeys(k for k in keys if k not in found))
+            # Repeats of a missing phrase within one call are encoded once and count as hits
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = self._get_model().encode([k[1] for k in missing], batch_size=batch_size, convert_to_numpy=True)
+            vectors = np.asarray(vectors, dtype=np.float32)
+            vectors.setflags(write=False)
+            with self._lock:
+                self.encode_batches += 1
+                now = time.monotonic()
+                for key, vector in zip(missing, vectors):
+                    found[key] = vector
+                    self._entries[key] = (vector, now)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[k] for k in keys])
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "model_name": self.model_name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "encode_batches": self.encode_batches,
+        }
@@ -0,0 +1,145 @@
+"""Bounded worker pools that keep blocking work off the event loop.
+
+`threads` runs GIL-releasing work (encoders, FAISS, NumPy, scikit-learn);
+`processes` runs pdfplumber parsing and OCR in spawned workers. Each pool
+admits at most max_workers + max_queue jobs; past that, submissions fail fast
+with PoolSaturated, which the app turns into a 503 so cheap endpoints stay
+responsive under a burst of uploads.
+"""
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class PoolSaturated(Exception):
+    def __init__(self, pool_name):
+        super().__init__(f"The {pool_name} pool is saturated, please retry shortly.")
+        self.pool_name = pool_name
+
+
+def _timed_call(fn, args, kwargs):
+    # Runs inside the worker; wall-clock time is comparable across processes
+    started = time.time()
+    return started, fn(*args, **kwargs)
+
+
+class WorkerPool:
+    def __init__(self, name, kind, max_workers, max_queue, initializer=None, initargs=()):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind {kind!r}.")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._initializer = initializer
+        self._initargs = initargs
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "thread":
+                        self._executor = ThreadPoolExecutor(
+                            self.max_workers, thread_name_prefix=self.name,
+                            initializer=self._initializer, initargs=self._initargs
+                        )
+                    else:
+                        # spawn: forking a process that already runs threads can deadlock
+                        self._executor = ProcessPoolExecutor(
+                            self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+                            initializer=self._initializer, initargs=self._initargs
+                        )
+        return self._executor
+
+    def _admit(self, slots=1, jobs=1):
+        with self._lock:
+            if self.in_flight + slots > self.max_workers + self.max_queue:
+                self.rejected += jobs
+                raise PoolSaturated(self.name)
+            self.in_flight += slots
+            self.submitted += jobs
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    async def _execute(self, fn, args, kwargs):
+        submitted_at = time.time()
+        try:
+            started, result = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), functools.partial(_timed_call, fn, args, kwargs)
+            )
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+        finished = time.time()
+        with self._lock:
+            self.completed += 1
+            self.total_wait_seconds += max(0.0, started - submitted_at)
+            self.total_run_seconds += finished - started
+        return result
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in the pool and await its result."""
+        self._admit()
+        try:
+            return await self._execute(fn, args, kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def map(self, fn, items):
+        """Run fn over items with up to max_workers in parallel; results keep input order.
+
+        The whole batch is admitted at once and holds at most max_workers
+        slots, so a large upload cannot push single requests out of the queue.
+        """
+        items = list(items)
+        if not items:
+            return []
+        slots = min(len(items), self.max_workers)
+        self._admit(slots=slots, jobs=len(items))
+        try:
+            semaphore = asyncio.Semaphore(slots)
+
+            async def one(item):
+                async with semaphore:
+                    return await self._execute(fn, (item,), {})
+
+            return await asyncio.gather(*(one(item) for item in items))
+        finally:
+            with self._lock:
+                self.in_flight -= slots
+
+    def stats(self):
+        done = self.completed or 1
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.max_workers),
+            "max_in_flight": self.max_in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(1000 * self.total_wait_seconds / done, 2),
+            "avg_run_ms": round(1000 * self.total_run_seconds / done, 2),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,160 @@
+"""Typo-tolerant phrase matching for OCR output.
+
+The catalogue phrases (course titles, platform names and aliases) are split
+into tokens whose vocabulary is held in a BK-tree. A document is tokenized
+once into an inverted index (token -> positions); each distinct document
+token is looked up in the tree within an edit budget that grows with token
+length, so "Courserra" or "Machlne Learning" still match. Phrases are then
+aligned against consecutive document positions and scored by the share of
+their characters that matched, which is reported as the confidence.
+Digits inside words are folded to the letters OCR mistakes them for first.
+"""
+from collections import defaultdict
+from functools import lru_cache
+
+from text_matcher import normalize_text
+
+# Digits OCR commonly reads in place of letters
+_OCR_CONFUSIONS = str.maketrans("01568", "olsbb")
+
+
+def tokenize(text):
+    """Normalized tokens; digits inside words ("d0e", "1earning") are folded to letters."""
+    return [
+        token.translate(_OCR_CONFUSIONS) if not token.isdigit() and not token.isalpha() else token
+        for token in normalize_text(text).split()
+    ]
+
+
+def max_edits(token):
+    # Short tokens must match exactly, or every two-letter word would match every other
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 6 else 2
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 once it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    def __init__(self, words=()):
+        self._root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            # Distances here are exact; the tree's pruning relies on the triangle inequality
+            distance = edit_distance(word, node[0], max(len(word), len(node[0])))
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word, limit):
+        """Yield (word, distance) for every stored word within limit edits."""
+        if self._root is None:
+            return
+        stack = [self._root]
+        while stack:
+            candidate, children = stack.pop()
+            # Beyond limit + the largest edge no child can qualify, so the exact distance is not needed
+            distance = edit_distance(word, candidate, limit + max(children, default=0))
+            if distance <= limit:
+                yield candidate, distance
+            for edge, child in children.items():
+                if distance - limit <= edge <= distance + limit:
+                    stack.append(child)
+
+
+class TokenizedDocument:
+    """Token-level inverted index over one document (e.g. OCR output)."""
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.positions = defaultdict(list)
+        for position, token in enumerate(self.tokens):
+            self.positions[token].append(position)
+
+
+class FuzzyPhraseIndex:
+    def __init__(self, phrases, lookup_cache_size=50000):
+        """`phrases` is an iterable of (key, text); a key may have several texts (aliases)."""
+        self._phrases = []
+        self._postings = defaultdict(list)
+        for key, text in phrases:
+            tokens = tokenize(text)
+            if tokens:
+                phrase_id = len(self._phrases)
+                self._phrases.append((key, tokens))
+                for position, token in enumerate(tokens):
+                    self._postings[token].append((phrase_id, position))
+        self._tree = BKTree(self._postings)
+        # OCR output repeats the same boilerplate words from certificate to certificate
+        self._lookup = lru_cache(maxsize=lookup_cache_size)(self._search)
+
+    def _search(self, doc_token):
+        limit = max_edits(doc_token)
+        if limit == 0:
+            return ((doc_token, 0),) if doc_token in self._postings else ()
+        return tuple((token, distance) for token, distance in self._tree.search(doc_token, limit)
+                     if distance <= max_edits(token))
+
+    def _token_hits(self, document):
+        """{catalogue token: {document position: edits}} for every fuzzy token match."""
+        hits = defaultdict(dict)
+        for doc_token, positions in document.positions.items():
+            for token, distance in self._lookup(doc_token):
+                for position in positions:
+                    hits[token][position] = min(distance, hits[token].get(position, distance))
+        return hits
+
+    @staticmethod
+    def _align(tokens, hits):
+        """(confidence, start) of the best placement of tokens on consecutive positions."""
+        total = sum(len(t) for t in tokens)
+        starts = {position - j for j, token in enumerate(tokens) for position in hits.get(token, ())}
+        best = (0.0, None)
+        for start in starts:
+            matched = 0
+            for j, token in enumerate(tokens):
+                distance = hits.get(token, {}).get(start + j)
+                if distance is not None:
+                    matched += len(token) - distance
+            best = max(best, (matched / total, start), key=lambda item: item[0])
+        return best
+
+    def match(self, document, min_confidence=0.85):
+        """{key: (confidence, start, end)} for phrases found in a TokenizedDocument."""
+        hits = self._token_hits(document)
+        candidates = {phrase_id for token in hits for phrase_id, _ in self._postings[token]}
+        found = {}
+        for phrase_id in candidates:
+            key, tokens = self._phrases[phrase_id]
+            # Skip phrases that cannot reach the threshold even if every hit lines up
+            reachable = sum(len(t) for t in tokens if t in hits) / sum(len(t) for t in tokens)
+            if reachable < min_confidence:
+                continue
+            confidence, start = self._align(tokens, hits)
+            if confidence >= min_confidence and confidence > found.get(key, (0.0,))[0]:
+                found[key] = (round(confidence, 3), start, start + len(tokens))
+        return found
@@ -0,0 +1,348 @@
+"""Incremental corpus ingestion for the RAG chatbot.
+
+The base corpus (text_chunks.txt) is indexed by the artifact store. Chunks
+added later are appended to an on-disk delta log, together with their
+embeddings, and applied to the live FAISS index with add_with_ids. Deletions
+are logged and applied with remove_ids, or filtered at query time for index
+types that cannot drop vectors. Every worker replays entries it has not seen
+yet, so an ingest done through one worker or the CLI reaches all of them
+without a rebuild. A writer applies each entry to its own index before
+logging it, and replay skips entries it cannot apply, so one bad entry never
+keeps a worker from starting.
+
+Each chunk has a source key (e.g. "jobs:12", "course:Google:Google Data
+Analytics"). Re-ingesting a key with unchanged text is a no-op; changed text
+replaces the old chunk.
+
+The CLI is the main way in; the API's POST /ingest and DELETE /ingest/{id}
+are disabled unless INGEST_ADMIN_TOKEN is set.
+
+CLI:
+    python ingest.py jobs [--path ai_job_market_insights.csv]
+    python ingest.py courses [--path Coursera.csv]
+    python ingest.py text FILE --source NAME
+    python ingest.py delete ID [ID ...]
+"""
+import argparse
+import base64
+import fcntl
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from chunker import chunk_digest, parse_documents
+from rag_index import prepare_vectors, search as search_index, supports_removal
+
+DELTA_ID_BASE = 1 << 40
+
+
+def job_row_text(row):
+    # Same template as the generated chunks in text_chunks.txt
+    remote = "remote-friendly" if str(row["Remote_Friendly"]).strip().lower() == "yes" else "not remote-friendly"
+    return (
+        f"The role of a {row['Job_Title']} in the {row['Industry']} industry, located in {row['Location']}, "
+        f"requires skills in {row['Required_Skills']}. The company size is {row['Company_Size']}, "
+        f"with an AI adoption level of {row['AI_Adoption_Level']} and an automation risk marked as "
+        f"{row['Automation_Risk']}. The job is {remote}, and has a projected job growth of "
+        f"{row['Job_Growth_Projection']}."
+    )
+
+
+def course_row_text(row):
+    from course_index import parse_course_skills
+    skills = ", ".join(parse_course_skills(row["skills"])) or "general topics"
+    return (
+        f"The course {row['course']} offered by {row['partner']} on Coursera covers {skills}. "
+        f"It is a {str(row['level']).strip()} level {str(row['certificatetype']).strip()} "
+        f"taking {str(row['duration']).strip()}, rated {row['rating']}."
+    )
+
+
+def job_chunks(path):
+    df = pd.read_csv(path)
+    return [(f"jobs:{i}", job_row_text(row)) for i, row in df.iterrows()]
+
+
+def course_chunks(path):
+    df = pd.read_csv(path)
+    return [(f"course:{row['partner']}:{row['course']}", course_row_text(row)) for _, row in df.iterrows()]
+
+
+def text_chunks_from(text, source, chunk_fn=None):
+    chunks = parse_documents(text)
+    if chunk_fn is not None:
+        chunks = chunk_fn(chunks)
+    return [(f"text:{source}:{i}", chunk) for i, chunk in enumerate(chunks)]
+
+
+class LiveCorpus:
+    def __init__(self, base, index, spec, delta_path, model_name, encode_fn):
+        # `base` is the ChunkStore the index was built from (ids 0..len-1); only
+        # ingested chunks are held as Python strings
+        self.base = base
+        self.index = index
+        self.spec = spec
+        self.delta_path = delta_path
+        self.model_name = model_name
+        self._encode = encode_fn
+        self.texts = {}
+        self.keys = {}
+        self.key_of = {}
+        self.hashes = {base.digest(i): i for i in range(len(base))}
+        self.deleted_base = set()
+        self.tombstones = set()
+        self.next_id = DELTA_ID_BASE
+        self.skipped = 0
+        self._offset = 0
+        self._lock = threading.RLock()
+        self.refresh()
+
+    # -- log replay ---------------------------------------------------------
+
+    def _read_new_entries(self):
+        if not os.path.exists(self.delta_path) or os.path.getsize(self.delta_path) <= self._offset:
+            return []
+        with open(self.delta_path, "r", encoding="utf-8") as f:
+            f.seek(self._offset)
+            entries = []
+            for line in f:
+                # A line without its newline is still being written by another process
+                if not line.endswith("\n"):
+                    break
+                self._offset += len(line.encode("utf-8"))
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    self.skipped += 1
+        return entries
+
+    def refresh(self):
+        """Apply delta-log entries written since the last call (by any process)."""
+        with self._lock:
+            entries = self._read_new_entries()
+            if not entries:
+                return 0
+            adds = [e for e in entries if e.get("op") == "add" and "text" in e]
+            stale = [e for e in adds if e.get("model") != self.model_name]
+            if stale:
+                # Vectors from another encoder are re-embedded in one batch
+                fresh = self._encode([e["text"] for e in stale])
+                for e, vector in zip(stale, fresh):
+                    e["_vector"] = np.asarray(vector, dtype=np.float32)
+
+            for entry in entries:
+                try:
+                    self._apply(entry)
+                except (KeyError, ValueError, RuntimeError):
+                    # One unusable entry must not keep every later worker from starting
+                    self.skipped += 1
+            return len(entries)
+
+    @property
+    def version(self):
+        # Grows with every applied ingest or delete
+        return self._offset
+
+    def text(self, chunk_id):
+        if 0 <= chunk_id < len(self.base):
+            return None if chunk_id in self.deleted_base else self.base[chunk_id]
+        return self.texts.get(chunk_id)
+
+    def _matches_base(self, entry):
+        # Base ids are positions in the current chunk store; a delete logged against an
+        # older build of it must not hit whatever chunk now sits at that position
+        chunk_id = entry["id"]
+        if chunk_id >= DELTA_ID_BASE or "digest" not in entry:
+            return True
+        return chunk_id < len(self.base) and self.base.digest(chunk_id).hex() == entry["digest"]
+
+    def _apply(self, entry):
+        if entry["op"] == "add":
+            vector = entry.get("_vector")
+            if vector is None:
+                vector = np.frombuffer(base64.b64decode(entry["vector"]), dtype=np.float32)
+            if vector.shape != (self.index.d,):
+                raise ValueError(f"Vector of shape {vector.shape} does not fit a {self.index.d}-d index.")
+            self._apply_add(entry["id"], entry["key"], entry["text"], vector)
+        elif entry["op"] == "delete":
+            if self._matches_base(entry):
+                self._apply_delete(entry["id"])
+        else:
+            raise ValueError(f"Unknown delta op {entry['op']!r}.")
+
+    def _apply_add(self, chunk_id, key, text, vector):
+        self.index.add_with_ids(prepare_vectors(vector[None, :], self.spec), np.array([chunk_id], dtype=np.int64))
+        self.texts[chunk_id] = text
+        self.keys[key] = chunk_id
+        self.key_of[chunk_id] = key
+        self.hashes.setdefault(chunk_digest(text), chunk_id)
+        self.tombstones.discard(chunk_id)
+        self.next_id = max(self.next_id, chunk_id + 1)
+
+    def _apply_delete(self, chunk_id):
+        text = self.text(chunk_id)
+        if text is None:
+            return
+        if 0 <= chunk_id < len(self.base):
+            self.deleted_base.add(chunk_id)
+        else:
+            del self.texts[chunk_id]
+        key = self.key_of.pop(chunk_id, None)
+        if key is not None and self.keys.get(key) == chunk_id:
+            del self.keys[key]
+        digest = chunk_digest(text)
+        if self.hashes.get(digest) == chunk_id:
+            del self.hashes[digest]
+        if supports_removal(self.spec):
+            self.index.remove_ids(np.array([chunk_id], dtype=np.int64))
+        else:
+            self.tombstones.add(chunk_id)
+
+    def _append(self, entries):
+        os.makedirs(os.path.dirname(self.delta_path) or ".", exist_ok=True)
+        with self._lock, open(self.delta_path, "a", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # Ids are allocated under the lock so concurrent writers never collide
+                self.refresh()
+                lines = []
+                try:
+                    for entry in entries:
+                        if entry["op"] == "add":
+                            # Embedding ran unlocked, so another writer may have stored this text meanwhile
+                            if self._holds(entry["key"], entry["text"]):
+                                continue
+                            if entry["id"] is None:
+                                entry["id"] = self.next_id
+                        # Applied before it is logged, so an entry the index rejects
+                        # fails this request instead of every later replay
+                        self._apply(entry)
+                        lines.append(json.dumps(entry) + "\n")
+                finally:
+                    # Whatever was applied is logged, keeping this worker and the log in step
+                    if lines:
+                        data = "".join(lines)
+                        f.write(data)
+                        f.flush()
+                        os.fsync(f.fileno())
+                        self._offset += len(data.encode("utf-8"))
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _holds(self, key, text):
+        existing = self.keys.get(key)
+        return existing is not None and chunk_digest(self.texts[existing]) == chunk_digest(text)
+
+    # -- public API -----------------------------------------------------------
+
+    def ingest(self, chunks, batch_size=64):
+        """Add (key, text) chunks; only new or changed chunks are embedded.
+
+        The corpus lock is only held to plan the work and to apply each batch,
+        never while encoding, so queries keep running during a large ingest.
+        """
+        with self._lock:
+            self.refresh()
+            summary = {"added": 0, "updated": 0, "unchanged": 0, "duplicates": 0}
+            todo, replaced = [], []
+            seen = set()
+            for key, text in chunks:
+                text = text.strip()
+                digest = chunk_digest(text)
+                existing = self.keys.get(key)
+                if existing is not None and chunk_digest(self.texts[existing]) == digest:
+                    summary["unchanged"] += 1
+                elif existing is None and (digest in self.hashes or digest in seen):
+                    summary["duplicates"] += 1
+                else:
+                    if existing is not None:
+                        replaced.append(existing)
+                        summary["updated"] += 1
+                    else:
+                        summary["added"] += 1
+                    todo.append((key, text))
+                    seen.add(digest)
+
+        for start in range(0, len(todo), batch_size):
+            batch = todo[start:start + batch_size]
+            vectors = np.asarray(self._encode([text for _, text in batch]), dtype=np.float32)
+            entries = [
+                {
+                    "op": "add", "id": None, "key": key, "text": text, "model": self.model_name,
+                    "vector": base64.b64encode(vector.tobytes()).decode("ascii"),
+                }
+                for (key, text), vector in zip(batch, vectors)
+            ]
+            self._append(entries)
+        # Old versions are dropped only after their replacements are searchable
+        if replaced:
+            self._append([{"op": "delete", "id": i} for i in replaced])
+        return summary
+
+    def delete(self, ids):
+        with self._lock:
+            self.refresh()
+            known = [int(i) for i in ids if self.text(int(i)) is not None]
+            if known:
+                self._append([self._delete_entry(i) for i in known])
+            return len(known)
+
+    def _delete_entry(self, chunk_id):
+        if chunk_id < len(self.base):
+            return {"op": "delete", "id": chunk_id, "digest": self.base.digest(chunk_id).hex()}
+        return {"op": "delete", "id": chunk_id}
+
+    def search(self, query_vectors, top_k):
+        with self._lock:
+            fetch = top_k + len(self.tombstones)
+            _, ids = search_index(self.index, query_vectors, self.spec, fetch)
+            hits = [int(i) for i in ids[0] if i >= 0 and int(i) not in self.tombstones]
+            texts = [self.text(i) for i in hits]
+            return [t for t in texts if t is not None][:top_k]
+
+    def stats(self):
+        return {
+            "chunks": len(self.base) - len(self.deleted_base) + len(self.texts),
+            "base_store_bytes": self.base.nbytes(),
+            "index_vectors": int(self.index.ntotal),
+            "tombstones": len(self.tombstones),
+            "delta_log_bytes": self._offset,
+            "skipped_entries": self.skipped,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest chunks into the RAG corpus without a rebuild.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    jobs = sub.add_parser("jobs")
+    jobs.add_argument("--path", default="ai_job_market_insights.csv")
+    courses = sub.add_parser("courses")
+    courses.add_argument("--path", default="Coursera.csv")
+    text = sub.add_parser("text")
+    text.add_argument("file")
+    text.add_argument("--source", required=True)
+    delete = sub.add_parser("delete")
+    delete.add_argument("ids", nargs="+", type=int)
+    args = parser.parse_args()
+
+    import main as app_main
+    corpus = app_main.rag.get()
+    if args.command == "jobs":
+        print(corpus.ingest(job_chunks(args.path)))
+    elif args.command == "courses":
+        print(corpus.ingest(course_chunks(args.path)))
+    elif args.command == "text":
+        with open(args.file, "r", encoding="utf-8") as f:
+            print(corpus.ingest(text_chunks_from(f.read(), args.source, app_main.chunk_rag_documents)))
+    else:
+        print({"deleted": corpus.delete(args.ids)})
+    print(corpus.stats())
+
+
+if __name__ == "__main__":
+    main()
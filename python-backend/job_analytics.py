@@ -0,0 +1,89 @@
+"""Materialized aggregates and paginated rows for /job-analysis.
+
+Aggregates are computed and serialized once per version of the CSV. The
+version digest doubles as the ETag so dashboards can revalidate with
+If-None-Match instead of downloading the payload again.
+"""
+import json
+import math
+import threading
+import zlib
+
+import pandas as pd
+
+from data_version import FileVersion
+
+MAX_PAGE_SIZE = 500
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class JobAnalytics:
+    def __init__(self, csv_path):
+        self.version = FileVersion(csv_path)
+        self.df = None
+        self._payloads = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            if self.version.refresh() or self.df is None:
+                self.df = pd.read_csv(self.version.path)
+                self._payloads = {}
+
+    def etag(self, variant):
+        return f'"{self.version.digest[:16]}-{variant}"'
+
+    def _aggregates(self, df):
+        salary_by_title = df.groupby("Job_Title", as_index=False)["Salary_USD"].mean().sort_values(by="Salary_USD", ascending=False).to_dict('records')
+        industry_distribution = df["Industry"].value_counts().reset_index().rename(columns={"count": "value"}).to_dict('records')
+        return {
+            "salary_by_title": salary_by_title,
+            "industry_distribution": industry_distribution,
+            "total_rows": len(df),
+            "columns": list(df.columns),
+        }
+
+    def summary(self, include_raw=False):
+        """Return (etag, serialized JSON bytes) for the current data version."""
+        self.refresh()
+        variant = "raw" if include_raw else "agg"
+        with self._lock:
+            if variant not in self._payloads:
+                body = self._aggregates(self.df)
+                if include_raw:
+                    body["raw_data"] = self.df.to_dict('records')
+                self._payloads[variant] = json.dumps(body).encode("utf-8")
+            return self.etag(variant), self._payloads[variant]
+
+    def page(self, page=1, page_size=100, columns=None):
+        """Return (etag, body) for one page of rows restricted to `columns`."""
+        self.refresh()
+        df = self.df
+        if columns:
+            unknown = [c for c in columns if c not in df.columns]
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        else:
+            columns = list(df.columns)
+        if page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page must be >= 1 and page_size between 1 and {MAX_PAGE_SIZE}.")
+
+        start = (page - 1) * page_size
+        rows = df.iloc[start:start + page_size][columns].to_dict('records')
+        body = {
+            "page": page,
+            "page_size": page_size,
+            "total_rows": len(df),
+            "total_pages": math.ceil(len(df) / page_size),
+            "columns": columns,
+            "rows": rows,
+        }
+        # crc32 rather than hash(): str hashes are salted per worker process
+        variant = f"p{page}-{page_size}-{zlib.crc32(','.join(columns).encode()):08x}"
+        return self.etag(variant), body
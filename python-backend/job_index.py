@@ -0,0 +1,81 @@
+"""In-memory TF-IDF index over ai_job_market_insights.csv for /recommend-jobs.
+
+Each job's Required_Skills are mapped into the shared skill vocabulary and
+IDF-weighted with a TfidfTransformer, fitted once per version of the CSV;
+scoring a user is then a single sparse mat-vec plus an argpartition top-k.
+A user skill that is not a job skill falls back to the job skills sharing a
+word with it ("python programming" -> Python, "data" -> Data Analysis); if
+nothing matches at all, no jobs are recommended.
+"""
+import threading
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfTransformer
+
+from data_version import FileVersion
+from skill_vocab import canonical_skill, split_skills
+from vector_utils import top_k_indices
+
+
+class JobIndex:
+    def __init__(self, csv_path, vocab):
+        self.version = FileVersion(csv_path)
+        self.vocab = vocab
+        self.df = None
+        self.transformer = None
+        self.job_matrix = None
+        self.skill_words = {}
+        self._lock = threading.Lock()
+
+    def _fit(self):
+        df = pd.read_csv(self.version.path)
+        transformer = TfidfTransformer()
+        job_matrix = None
+        skill_words = defaultdict(set)
+        if not df.empty:
+            counts = self.vocab.encode([split_skills(raw) for raw in df['Required_Skills']], grow=True)
+            # TfidfTransformer L2-normalizes rows, so a dot product is cosine similarity
+            job_matrix = transformer.fit_transform(counts).tocsr()
+            for skill_id in np.unique(counts.indices):
+                for word in self.vocab.names[skill_id].split():
+                    skill_words[word].add(self.vocab.names[skill_id])
+        self.df, self.transformer, self.job_matrix = df, transformer, job_matrix
+        self.skill_words = dict(skill_words)
+
+    def refresh(self):
+        with self._lock:
+            if self.version.refresh() or self.df is None:
+                self._fit()
+
+    @property
+    def empty(self):
+        self.refresh()
+        return self.df.empty
+
+    def _expand(self, names, skill_words):
+        """Job-skill names for the user's skills, falling back to shared words for unknown ones."""
+        expanded = []
+        for name in names:
+            skill = canonical_skill(name)
+            if skill is None:
+                continue
+            if self.vocab.get(skill) is not None:
+                expanded.append(skill)
+            else:
+                for word in skill.split():
+                    expanded.extend(skill_words.get(word, ()))
+        return expanded
+
+    def recommend(self, skills, k=5):
+        self.refresh()
+        df, transformer, job_matrix, skill_words = self.df, self.transformer, self.job_matrix, self.skill_words
+        names = self._expand([s for raw in skills for s in split_skills(raw)], skill_words)
+        # Skills the vocabulary learned after this fit cannot occur in any job, so drop their columns
+        user_counts = self.vocab.encode([names])
+        user_vec = transformer.transform(user_counts[:, :job_matrix.shape[1]])
+        scores = (job_matrix @ user_vec.T).toarray().ravel()
+        top = top_k_indices(scores, k)
+        # Jobs sharing no skill with the user would otherwise fill the list in arbitrary order
+        return df.iloc[top[scores[top] > 0]]
@@ -1,23 +1,43 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-import pdfplumber
+# Imported first so the boot clock covers every other import
+from subsystems import mark_app_ready, startup_report, subsystem, warmup
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Header, Depends
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import re
-from sentence_transformers import SentenceTransformer, util
-import io
-from typing import List, Dict, Optional
+import asyncio
+import hmac
+import json
+import time
+from typing import List, Dict, Optional, Union
 import pandas as pd
 import os
-import faiss
 import groq
 import numpy as np
 from pydantic import BaseModel
-from sklearn.cluster import KMeans
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import plotly.express as px
 from fastapi.middleware.cors import CORSMiddleware
-from PIL import Image
-import cv2
+
+from answer_cache import SemanticAnswerCache
+from artifacts import ARTIFACT_DIR, ArtifactStore
+from career_model import CareerModel, append_population, load_profiles
+from chunker import chunk_documents, chunk_spec_from_env, parse_documents
+from course_index import CourseSkillIndex
+from documents import (
+    MAX_PDF_CHARS, MAX_PDF_PAGES, extract_pdf_pages, extract_text_from_pdf, pdf_text_layer, rasterize_pdf_pages
+)
+from embedding_cache import EmbeddingCache
+from executor import PoolSaturated, WorkerPool
+from fuzzy_matcher import FuzzyPhraseIndex, TokenizedDocument
+from job_analytics import JobAnalytics, etag_matches
+from job_index import JobIndex
+from micro_batcher import MicroBatcher
+from model_registry import DEFAULT_MODEL, get_encoder, registry
+from ocr_engine import OcrEngine, complement_regions, parse_region
+from ingest import LiveCorpus, course_chunks, job_chunks, text_chunks_from
+from rag_index import build_index as build_rag_index, configure_search, index_spec_from_env
+from result_cache import content_key, from_env as result_cache_from_env
+from role_catalog import RoleCatalog
+from skill_matcher import SkillAccumulator, SkillMatcher
+from skill_vocab import SkillVocabulary
+from text_matcher import MultiPatternMatcher
 
 app = FastAPI()
 
@@ -31,15 +51,83 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize PaddleOCR for certificate verification
-from paddleocr import PaddleOCR
-ocr = PaddleOCR(use_angle_cls=True, lang='en')
+# Blocking work runs in bounded pools: threads for encoders/FAISS/sklearn,
+# spawned processes for pdfplumber; OCR has its own process pool in ocr_engine
+thread_pool = WorkerPool(
+    "threads", "thread",
+    max_workers=int(os.getenv("THREAD_POOL_WORKERS", "4")),
+    max_queue=int(os.getenv("THREAD_POOL_QUEUE", "32"))
+)
+process_pool = WorkerPool(
+    "processes", "process",
+    max_workers=int(os.getenv("PROCESS_POOL_WORKERS", "2")),
+    max_queue=int(os.getenv("PROCESS_POOL_QUEUE", "8"))
+)
+# Each OCR worker process holds one PaddleOCR engine; concurrent images are batched per task
+ocr_engine = OcrEngine(
+    max_workers=int(os.getenv("OCR_POOL_WORKERS", "2")),
+    max_queue=int(os.getenv("OCR_POOL_QUEUE", "8")),
+    max_batch_items=int(os.getenv("OCR_BATCH_MAX_ITEMS", "4")),
+    max_wait_ms=float(os.getenv("OCR_BATCH_MAX_WAIT_MS", "10")),
+    use_angle_cls=os.getenv("OCR_ANGLE_CLS", "1") == "1",
+    warm=os.getenv("OCR_POOL_WARM", "0") == "1"
+)
+
+# Upload limits; requests whose declared size is over the cap are refused before the body is read
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 2**20)))
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(100 * 2**20)))
+PDF_PAGE_BATCH = int(os.getenv("PDF_PAGE_BATCH", "4"))
+
+@app.middleware("http")
+async def reject_oversized_requests(request: Request, call_next):
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > MAX_REQUEST_BYTES:
+        return JSONResponse(status_code=413, content={"error": f"Request body exceeds {MAX_REQUEST_BYTES} bytes."})
+    return await call_next(request)
+
+# Extracted text, OCR output and skills keyed by SHA-256 of the upload;
+# set RESULT_CACHE_SQLITE to a file path to keep results across restarts
+result_cache = result_cache_from_env()
+
+async def cache_get(namespace, key):
+    # SQLite reads and writes block, so a persistent cache is used off the event loop
+    if result_cache.persistent:
+        return await thread_pool.run(result_cache.get, namespace, key)
+    return result_cache.get(namespace, key)
+
+async def cache_set(namespace, key, value):
+    if result_cache.persistent:
+        await thread_pool.run(result_cache.set, namespace, key, value)
+    else:
+        result_cache.set(namespace, key, value)
 
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    return JSONResponse(status_code=503, content={"error": str(exc)}, headers={"Retry-After": "1"})
+
+# Heavy engines are built on first use, or up front via WARMUP_SUBSYSTEMS / POST /warmup
 # Load course data for certificate verification
 course_df = pd.read_csv("coursera_skill_clusters.csv")
+# One automaton over every course name; loose mode ignores case, punctuation and spacing
+course_matcher = MultiPatternMatcher(
+    ((idx, name) for idx, name in course_df["course"].items() if pd.notna(name)),
+    loose=os.getenv("CERT_MATCH_LOOSE", "1") != "0"
+)
+
+# Typo-tolerant lookup of course titles and platforms in OCR text; platforms come from PLATFORMS_FILE
+PLATFORMS_FILE = os.getenv("PLATFORMS_FILE", "platforms.json")
+with open(PLATFORMS_FILE, "r", encoding="utf-8") as f:
+    platforms = json.load(f)
+certificate_index = FuzzyPhraseIndex(
+    [(("course", idx), name) for idx, name in course_df["course"].items() if pd.notna(name)]
+    + [(("platform", p["name"]), alias) for p in platforms for alias in [p["name"], *p.get("aliases", [])]]
+)
+CERT_MIN_CONFIDENCE = float(os.getenv("CERT_MIN_CONFIDENCE", "0.85"))
+# One edit separates different people ("Mary"/"Mark"), so names need exact tokens after OCR digit folding
+CERT_NAME_MIN_CONFIDENCE = float(os.getenv("CERT_NAME_MIN_CONFIDENCE", "1.0"))
 
-# Load model once for skill extraction
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# Shared encoder for skill extraction, RAG and role matching
+encoder = subsystem("encoder", get_encoder)
 
 known_skills = list(set([
     "python", "numpy", "pandas", "matplotlib", "seaborn", "plotly", "cufflinks", "geoplotting",
@@ -49,7 +137,43 @@ known_skills = list(set([
     "hugging face", "t5", "wav2vec2", "google colab", "flask", "streamlit", "react",
     "pytorch", "tensorflow", "linux", "git", "docker", "mysql", "postgresql"
 ]))
-skill_embeddings = model.encode(known_skills, convert_to_tensor=True)
+skill_index = subsystem("skills", lambda: SkillMatcher.from_encoder(known_skills, encoder.get()))
+
+# One id space for skills across resumes, jobs, courses and career clusters; sets travel as CSR rows
+skill_vocab = SkillVocabulary(sorted(known_skills))
+
+# Career clusters trained offline with `python career_model.py train`; profiles label the centroids
+CAREER_MODEL_FILE = os.getenv("CAREER_MODEL_FILE", os.path.join(ARTIFACT_DIR, "career_model.npz"))
+CAREER_PROFILES_FILE = os.getenv("CAREER_PROFILES_FILE", "career_profiles.json")
+CAREER_POPULATION_FILE = os.getenv("CAREER_POPULATION_FILE", os.path.join(ARTIFACT_DIR, "skill_population.jsonl"))
+CAREER_MODEL_ONLINE = os.getenv("CAREER_MODEL_ONLINE", "0") == "1"
+# Opt-in: the log grows by a line per resume and nothing rotates it
+CAREER_POPULATION_LOG = os.getenv("CAREER_POPULATION_LOG", "0") == "1"
+
+def load_career_model():
+    if os.path.exists(CAREER_MODEL_FILE):
+        return CareerModel.load(CAREER_MODEL_FILE)
+    return CareerModel.from_profiles(sorted(known_skills), load_profiles(CAREER_PROFILES_FILE))
+
+career_model = subsystem("career_model", load_career_model)
+
+# Concurrent encode calls from every endpoint are merged into shared forward passes
+encoder_batcher = MicroBatcher(
+    lambda texts: encoder.get().encode(texts, convert_to_numpy=True),
+    max_batch_items=int(os.getenv("ENCODER_BATCH_MAX_ITEMS", "64")),
+    max_wait_ms=float(os.getenv("ENCODER_BATCH_MAX_WAIT_MS", "5"))
+)
+
+# Resumes repeat the same short phrases; only cache misses reach the encoder
+phrase_cache = EmbeddingCache(
+    lambda: encoder_batcher, DEFAULT_MODEL,
+    max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "50000")),
+    ttl_seconds=float(os.getenv("EMBEDDING_CACHE_TTL", str(24 * 3600)))
+)
+
+JOB_DATA_FILE = "ai_job_market_insights.csv"
+job_index = JobIndex(JOB_DATA_FILE, skill_vocab)
+job_analytics = JobAnalytics(JOB_DATA_FILE)
 
 career_mapping = {
     0: "Machine Learning Engineer",
@@ -67,30 +191,63 @@ GROQ_API_KEY = "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"
 # Setup Groq client
 os.environ["GROQ_API_KEY"] = GROQ_API_KEY
 client = groq.Client(api_key=os.getenv("GROQ_API_KEY"))
+# Used by /query/stream so token streaming does not hold a worker thread
+async_client = groq.AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+GROQ_CHAT_MODEL = "llama3-8b-8192"
+
+RAG_MODEL_NAME = DEFAULT_MODEL
+
+# Index type is chosen with RAG_INDEX_KIND (flat-l2, flat-ip, hnsw, ivfpq); see rag_index.py
+rag_index_spec = index_spec_from_env()
+# Window size and overlap in encoder tokens (CHUNK_MAX_TOKENS, CHUNK_OVERLAP); see chunker.py
+rag_chunk_spec = chunk_spec_from_env(RAG_MODEL_NAME)
 
-# Load model
-model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+artifact_store = ArtifactStore()
+
+def chunk_rag_documents(documents):
+    return chunk_documents(documents, rag_chunk_spec, getattr(encoder.get(), "tokenizer", None))
 
 # Load text chunks
 def load_text_chunks(filepath):
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"{filepath} not found.")
-    with open(filepath, "r", encoding="utf-8") as f:
-        return f.read().splitlines()
 
-text_chunks = load_text_chunks(TEXT_FILE)
-index = faiss.IndexFlatL2(model.get_sentence_embedding_dimension())
-embeddings = model.encode(text_chunks, convert_to_numpy=True).astype(np.float32)
-index.add(embeddings)
+    def build_chunks():
+        with open(filepath, "r", encoding="utf-8") as f:
+            return chunk_rag_documents(parse_documents(f.read()))
+
+    return artifact_store.load_chunks(filepath, rag_chunk_spec, build_chunks)
+
+def load_rag():
+    text_chunks = load_text_chunks(TEXT_FILE)
+    # Reuse the persisted embeddings/index unless the chunks or the model changed; the
+    # digests file changes whenever text_chunks.txt or the chunking spec does
+    _, index = artifact_store.load_or_build(
+        artifact_store.path("chunks.digests.npy"), text_chunks, encoder.get(), RAG_MODEL_NAME,
+        lambda vectors: build_rag_index(vectors, rag_index_spec), index_spec=rag_index_spec
+    )
+    # Chunks ingested after the build are replayed from the delta log on top (see ingest.py)
+    return LiveCorpus(
+        text_chunks, configure_search(index, rag_index_spec), rag_index_spec,
+        artifact_store.path("corpus_delta.jsonl"), RAG_MODEL_NAME,
+        lambda texts: encoder_batcher.encode(texts)
+    )
+
+rag = subsystem("rag", load_rag)
+
+# Near-duplicate questions reuse an earlier answer instead of calling Groq again
+answer_cache = SemanticAnswerCache(
+    threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92")),
+    max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "1000")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+)
 
 # FAISS Search
-def search_chunks(query, chunks, index, top_k=TOP_K):
-    query_embedding = model.encode([query]).astype(np.float32)
-    distances, indices = index.search(query_embedding, top_k)
-    return [chunks[i] for i in indices[0] if 0 <= i < len(chunks)]
+def search_chunks(query_embedding, corpus, top_k=TOP_K):
+    return corpus.search(query_embedding, top_k)
 
 # Groq Query
-def query_groq(query, context_chunks):
+def groq_messages(query, context_chunks):
     context = "\n".join(context_chunks)
     prompt = f"""
 You are a personal AI career advisor. Only respond to queries related to the technologies in the software engineering that are  "python", "numpy", "pandas", "matplotlib", "seaborn", "plotly", "cufflinks", "geoplotting",
@@ -107,206 +264,315 @@ Use the following retrieved context to assist the user:
 Question: {query}
 Answer:
 """
+    return [
+        {"role": "system", "content": "You are a helpful AI."},
+        {"role": "user", "content": prompt}
+    ]
+
+def query_groq(query, context_chunks):
     response = client.chat.completions.create(
-        model="llama3-8b-8192",
-        messages=[
-            {"role": "system", "content": "You are a helpful AI."},
-            {"role": "user", "content": prompt}
-        ],
+        model=GROQ_CHAT_MODEL,
+        messages=groq_messages(query, context_chunks),
         max_tokens=300
     )
     return response.choices[0].message.content.strip()
 
+async def stream_groq(query, context_chunks):
+    stream = await async_client.chat.completions.create(
+        model=GROQ_CHAT_MODEL,
+        messages=groq_messages(query, context_chunks),
+        max_tokens=300,
+        stream=True
+    )
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
+
 def clean_resume_text(text):
     text = re.sub(r'[•|]', '\n', text)
     text = re.sub(r'\s+', ' ', text)
     return text.lower()
 
-def extract_skills_from_resume(resume_text, similarity_threshold=0.4):
+def split_phrases(resume_text):
     resume_text = clean_resume_text(resume_text)
     phrases = re.split(r'[\n,.;:]', resume_text)
-    phrases = [phrase.strip() for phrase in phrases if len(phrase.strip()) >= 2]
-    phrase_embeddings = model.encode(phrases, convert_to_tensor=True)
-
-    extracted_skills = set()
-    for i, phrase in enumerate(phrases):
-        sim = util.cos_sim(phrase_embeddings[i], skill_embeddings)
-        top_idx = sim.argmax().item()
-        top_score = sim[0][top_idx].item()
-        if top_score >= similarity_threshold:
-            extracted_skills.add(known_skills[top_idx])
-
-    return sorted(extracted_skills)
-
-def extract_text_from_pdf(file_bytes):
-    full_text = ""
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                full_text += text + "\n"
-    return full_text.strip()
-
-def extract_text_from_image(image_bytes):
-    image = Image.open(io.BytesIO(image_bytes))
-    image_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-    results = ocr.ocr(image_cv, cls=True)
-    text = "\n".join([line[1][0] for line in results[0]])
+    return [phrase.strip() for phrase in phrases if len(phrase.strip()) >= 2]
+
+def extract_skill_matrix(resume_texts, similarity_threshold=0.4):
+    """Boolean (resumes x known skills) matrix from one batched encode of all unique phrases."""
+    phrase_ids = {}
+    doc_ids, unique_ids = [], []
+    for doc_id, text in enumerate(resume_texts):
+        for phrase in set(split_phrases(text)):
+            doc_ids.append(doc_id)
+            unique_ids.append(phrase_ids.setdefault(phrase, len(phrase_ids)))
+    matcher = skill_index.get()
+    if not phrase_ids:
+        return matcher.match_matrix([], [], len(resume_texts))
+    phrase_embeddings = phrase_cache.encode(list(phrase_ids))[unique_ids]
+    return matcher.match_matrix(phrase_embeddings, doc_ids, len(resume_texts), similarity_threshold)
+
+def match_pages(accumulator, pages):
+    phrases = [phrase for page in pages for phrase in split_phrases(page)]
+    if phrases:
+        accumulator.add(phrase_cache.encode(phrases))
+
+async def stream_pdf_pages(file_bytes):
+    """Yield lists of page texts within the page/char budget, in at most two process-pool jobs.
+
+    The first PDF_PAGE_BATCH pages come back on their own so encoding can start
+    while the rest of the document is parsed in a single job; each job ships
+    the upload to a worker and reopens it, so there are never more than two.
+    """
+    first = min(PDF_PAGE_BATCH, MAX_PDF_PAGES)
+    pages, total_pages = await process_pool.run(extract_pdf_pages, file_bytes, 0, first, MAX_PDF_CHARS)
+    if pages:
+        yield pages
+    chars_left = MAX_PDF_CHARS - sum(len(page) for page in pages)
+    rest = min(total_pages, MAX_PDF_PAGES) - first
+    if rest > 0 and chars_left > 0:
+        pages, _ = await process_pool.run(extract_pdf_pages, file_bytes, first, rest, chars_left)
+        if pages:
+            yield pages
+
+# Most certificates print the title, recipient and course in the upper part of the page
+CERT_OCR_REGION = parse_region(os.getenv("CERT_OCR_REGION", "0.0,0.0,1.0,0.7"))
+# How far (fraction of the image) the fallback strips reach back into the region
+CERT_OCR_OVERLAP = float(os.getenv("CERT_OCR_OVERLAP", "0.05"))
+CERT_OCR_MAX_PAGES = int(os.getenv("CERT_OCR_MAX_PAGES", "3"))
+
+async def ocr_cached(image_bytes, upright=False, region=None):
+    key = content_key(image_bytes, ocr_engine.max_side, upright, region)
+    text = await cache_get("ocr_text", key)
+    if text is None:
+        text = await ocr_engine.extract_text(image_bytes, upright, region)
+        await cache_set("ocr_text", key, text)
     return text
 
+async def extract_certificate_text(contents, content_type, is_complete, upright=False):
+    """(text, tier), trying the cheapest extraction first.
+
+    Tiers: "text_layer" (embedded PDF text only), then OCR of the likely
+    region ("ocr_region"), then of the whole image ("ocr_full"). For PDFs,
+    only pages without a text layer are rasterized and OCR'd, and the tier
+    is prefixed with "pdf_". OCR stops at the region tier when
+    `await is_complete(text)` accepts it; otherwise only the strips outside the
+    region are OCR'd and merged with the region text in page order.
+    """
+    known_text = []
+    if content_type == "application/pdf":
+        key = content_key(contents, MAX_PDF_PAGES, MAX_PDF_CHARS)
+        pages = await cache_get("pdf_pages", key)
+        if pages is None:
+            pages = await process_pool.run(pdf_text_layer, contents)
+            await cache_set("pdf_pages", key, pages)
+        empty = [i for i, page in enumerate(pages) if not page][:CERT_OCR_MAX_PAGES]
+        if not empty:
+            return "\n".join(pages).strip(), "text_layer"
+        known_text = [page for page in pages if page]
+        images = await process_pool.run(rasterize_pdf_pages, contents, empty)
+        prefix = "pdf_"
+    else:
+        images, prefix = [contents], ""
+
+    region_text = await asyncio.gather(*(ocr_cached(image, upright, CERT_OCR_REGION) for image in images))
+    text = "\n".join(known_text + list(region_text)).strip()
+    strips = complement_regions(CERT_OCR_REGION, CERT_OCR_OVERLAP) if CERT_OCR_REGION else []
+    if not strips:
+        return text, prefix + "ocr_full"
+    if await is_complete(text):
+        return text, prefix + "ocr_region"
+
+    # The overlap keeps a line cut by the region's edge whole in at least one part
+    strip_text = await asyncio.gather(*(ocr_cached(image, upright, strip) for image in images for strip in strips))
+    pages = []
+    for i, region_part in enumerate(region_text):
+        parts = [(CERT_OCR_REGION, region_part)] + list(zip(strips, strip_text[i * len(strips):(i + 1) * len(strips)]))
+        pages.append("\n".join(part for _, part in sorted(parts, key=lambda p: (p[0][1], p[0][0])) if part))
+    return "\n".join(known_text + pages).strip(), prefix + "ocr_full"
+
+async def read_upload(upload, max_bytes=None):
+    """Read an upload in chunks, failing with 413 as soon as it exceeds max_bytes."""
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"{upload.filename} exceeds the {max_bytes} byte upload limit.")
+    chunks, total = [], 0
+    while True:
+        chunk = await upload.read(1 << 20)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise HTTPException(status_code=413, detail=f"{upload.filename} exceeds the {max_bytes} byte upload limit.")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
 class VerificationResult(BaseModel):
-    courses_found: List[Dict[str, str]]
+    courses_found: List[Dict[str, Union[str, float]]]
     platform_verified: bool
+    platform: Optional[str] = None
+    platform_confidence: float = 0.0
     user_name_verified: bool
+    user_name_confidence: float = 0.0
     valid_certificate: bool
     extracted_text: Optional[str] = None
+    extraction_tier: Optional[str] = None
 
 class QueryRequest(BaseModel):
     query: str
 
+class IngestRequest(BaseModel):
+    kind: str
+    text: Optional[str] = None
+    source: Optional[str] = None
+
+def check_certificate(text, name):
+    # Tokenize the OCR output once; courses, platforms and the name are all looked up in it
+    document = TokenizedDocument(text)
+    found = certificate_index.match(document, CERT_MIN_CONFIDENCE)
+
+    # Match courses; exact (punctuation-insensitive) hits keep full confidence
+    course_confidence = {key[1]: hit[0] for key, hit in found.items() if key[0] == "course"}
+    for idx in course_matcher.find_keys(text):
+        course_confidence[idx] = 1.0
+    matched_courses = []
+    for idx in sorted(course_confidence):
+        row = course_df.loc[idx]
+        matched_courses.append({
+            "course_name": row["course"],
+            "cluster": row.get("cluster", "Unknown"),
+            "confidence": course_confidence[idx]
+        })
+
+    # Check platform
+    platform_hits = sorted(((hit[0], key[1]) for key, hit in found.items() if key[0] == "platform"), reverse=True)
+    platform_confidence, platform = platform_hits[0] if platform_hits else (0.0, None)
+
+    # Check user name
+    name_hit = FuzzyPhraseIndex([("name", name)], lookup_cache_size=0).match(document, CERT_NAME_MIN_CONFIDENCE)
+    name_confidence = name_hit["name"][0] if name_hit else 0.0
+
+    return {
+        "courses_found": matched_courses,
+        "platform_verified": platform is not None,
+        "platform": platform,
+        "platform_confidence": platform_confidence,
+        "user_name_verified": bool(name_hit),
+        "user_name_confidence": name_confidence,
+        "valid_certificate": bool(matched_courses and platform is not None),
+    }
+
 @app.post("/verify-certificate", response_model=VerificationResult)
 async def verify_certificate(
     name: str = Form(...),
-    certificate: UploadFile = File(...)
+    certificate: UploadFile = File(...),
+    upright: bool = Form(False)
 ):
     # Check file type
     if certificate.content_type not in ["image/jpeg", "image/png", "application/pdf"]:
         raise HTTPException(status_code=400, detail="Only JPEG, PNG, or PDF files are supported.")
 
     # Read and process file
-    contents = await certificate.read()
-    
-    if certificate.content_type == "application/pdf":
-        text = extract_text_from_pdf(contents)
-    else:
-        text = extract_text_from_image(contents)
+    contents = await read_upload(certificate)
     
+    # Fuzzy matching is CPU-bound, so it runs in the thread pool; each text is checked once
+    checks = {}
 
-  
+    async def check(candidate):
+        if candidate not in checks:
+            checks[candidate] = await thread_pool.run(check_certificate, candidate, name)
+        return checks[candidate]
 
-    # Match courses
-    matched_courses = []
-    for idx, row in course_df.iterrows():
-        course_name = row["course"]
-        if pd.notna(course_name) and course_name.lower() in text.lower():
-            matched_courses.append({
-                "course_name": course_name,
-                "cluster": row.get("cluster", "Unknown")
-            })
+    async def is_complete(candidate):
+        result = await check(candidate)
+        return result["valid_certificate"] and result["user_name_verified"]
 
-    # Check platform
-    platform_found = any(
-        p in text 
-        for p in ["coursera", "udemy", "edx", "skillshare"]
-    )
-    
-    # Check user name
-    user_verified = name in text
-
-    return {
-        "courses_found": matched_courses,
-        "platform_verified": platform_found,
-        "user_name_verified": user_verified,
-        "valid_certificate": bool(matched_courses and platform_found),
-        "extracted_text": text
-    }
+    # upright=true skips the OCR angle classifier for scans that are known to be straight
+    text, tier = await extract_certificate_text(contents, certificate.content_type, is_complete, upright)
+    return {**await check(text), "extracted_text": text, "extraction_tier": tier}
 
 @app.post("/extract-skills")
-async def extract_skills(file: UploadFile = File(...)):
+async def extract_skills(file: UploadFile = File(...), include_scores: bool = False):
     if file.content_type != "application/pdf":
         return JSONResponse(status_code=400, content={"error": "Only PDF files are supported."})
 
-    file_bytes = await file.read()
-    resume_text = extract_text_from_pdf(file_bytes)
-    skills = extract_skills_from_resume(resume_text)
-    return {"extracted_skills": skills}
+    file_bytes = await read_upload(file)
+    skills_key = content_key(file_bytes, DEFAULT_MODEL, MAX_PDF_PAGES, MAX_PDF_CHARS, include_scores)
+    cached = await cache_get("skills", skills_key)
+    if cached is not None:
+        return cached
+
+    # Pages are matched as they are parsed, overlapping extraction and encoding
+    accumulator = await thread_pool.run(lambda: SkillAccumulator(skill_index.get(), 0.4))
+    matching = []
+    async for pages in stream_pdf_pages(file_bytes):
+        matching.append(asyncio.ensure_future(thread_pool.run(match_pages, accumulator, pages)))
+    await asyncio.gather(*matching)
+
+    response = {"extracted_skills": accumulator.result()}
+    if include_scores:
+        # Every skill above the threshold against any phrase, best first, with its similarity
+        response["skill_scores"] = accumulator.scores()
+    await cache_set("skills", skills_key, response)
+    return response
 
 @app.post("/suggest-career")
 async def suggest_career(files: List[UploadFile] = File(...)):
-    all_skills_per_resume = []
-    file_names = []
-
     for file in files:
         if file.content_type != "application/pdf":
             return JSONResponse(status_code=400, content={"error": f"{file.filename} is not a PDF."})
 
-        file_bytes = await file.read()
-        resume_text = extract_text_from_pdf(file_bytes)
-        skills = extract_skills_from_resume(resume_text)
-        all_skills_per_resume.append(skills)
-        file_names.append(file.filename)
-
-    all_skills = list(set([skill.lower() for resume in all_skills_per_resume for skill in resume]))
-
-    def build_skill_matrix(resumes, all_skills):
-        matrix = []
-        for skills in resumes:
-            row = [1 if skill in skills else 0 for skill in all_skills]
-            matrix.append(row)
-        return pd.DataFrame(matrix, columns=all_skills)
-
-    skill_df = build_skill_matrix(all_skills_per_resume, all_skills)
-
-    k = min(6, len(files))
-    kmeans = KMeans(n_clusters=k, random_state=42)
-    skill_df["cluster"] = kmeans.fit_predict(skill_df)
-
-    cluster_to_top_skills = {}
-    for cluster_num in range(k):
-        cluster_skills = skill_df[skill_df["cluster"] == cluster_num].drop(columns=["cluster"]).sum()
-        top_skills = cluster_skills.sort_values(ascending=False).head(5).index.tolist()
-        cluster_to_top_skills[cluster_num] = top_skills
-
-    cluster_to_career = {}
-    for cluster_num, skills in cluster_to_top_skills.items():
-        if "machine learning" in skills or "pytorch" in skills or "tensorflow" in skills:
-            cluster_to_career[cluster_num] = "Machine Learning"
-        elif "html" in skills or "css" in skills or "javascript" in skills:
-            cluster_to_career[cluster_num] = "Frontend Developer"
-        elif "django" in skills or "flask" in skills or "sql" in skills:
-            cluster_to_career[cluster_num] = "Backend Developer"
-        elif "flutter" in skills or "android" in skills:
-            cluster_to_career[cluster_num] = "App Developer"
-        elif "docker" in skills or "linux" in skills or "aws" in skills:
-            cluster_to_career[cluster_num] = "Cloud Engineer"
-        else:
-            cluster_to_career[cluster_num] = "Generalist / Software Engineer"
+    file_names = [file.filename for file in files]
+    file_bytes = [await read_upload(file) for file in files]
+    # Parse every PDF concurrently, then match all resumes' phrases in one encoder batch
+    keys = [content_key(b, MAX_PDF_PAGES, MAX_PDF_CHARS) for b in file_bytes]
+    resume_texts = [await cache_get("pdf_text", key) for key in keys]
+    missing = [i for i, text in enumerate(resume_texts) if text is None]
+    parsed = await process_pool.map(extract_text_from_pdf, [file_bytes[i] for i in missing])
+    for i, text in zip(missing, parsed):
+        resume_texts[i] = text
+        await cache_set("pdf_text", keys[i], text)
+    results = await thread_pool.run(cluster_resumes, resume_texts, file_names)
+    return {"results": results}
+
+def cluster_resumes(resume_texts, file_names):
+    skill_matrix = extract_skill_matrix(resume_texts)
+    skill_names = skill_index.get().skills
+    skill_sets = [sorted(skill_names[i] for i in np.flatnonzero(row)) for row in skill_matrix]
+
+    # Nearest persisted centroid; no per-request fit, so cluster ids are stable across requests
+    model = career_model.get()
+    X = model.select(skill_vocab.encode(skill_sets), skill_vocab)
+    labels = model.predict(X)
+    if CAREER_MODEL_ONLINE:
+        model.partial_fit(X, labels)
+    if CAREER_POPULATION_LOG:
+        append_population(CAREER_POPULATION_FILE, [skills for skills in skill_sets if skills])
 
     results = []
-    for idx, skills in enumerate(all_skills_per_resume):
-        cluster = skill_df.iloc[idx]["cluster"]
+    for idx, skills in enumerate(skill_sets):
+        cluster = int(labels[idx])
         results.append({
             "file": file_names[idx],
             "skills": skills,
-            "cluster": int(cluster),
-            "career_suggestion": cluster_to_career[int(cluster)]
+            "cluster": cluster,
+            "career_suggestion": model.careers[cluster]
         })
 
-    return {"results": results}
+    return results
 
 @app.post("/recommend-jobs")
 async def recommend_jobs(skills: List[str]):
-    df = pd.read_csv("ai_job_market_insights.csv")
-
     try:
-        if df.empty:
+        if await thread_pool.run(lambda: job_index.empty):
             return JSONResponse(
                 status_code=404,
                 content={"error": "Job dataset not found. Please ensure ai_job_market_insights.csv exists."}
             )
 
-        # Vectorize job required skills
-        vectorizer = TfidfVectorizer(stop_words='english')
-        X = vectorizer.fit_transform(df['Required_Skills'].fillna(""))
-
-        # Prepare user input
-        user_input = ', '.join(skills)
-        user_vec = vectorizer.transform([user_input])
-
-        # Compute cosine similarity
-        similarities = cosine_similarity(user_vec, X).flatten()
-        top_indices = similarities.argsort()[-5:][::-1]
-        recommended_jobs = df.iloc[top_indices]
+        # Vectorizer and job matrix are cached and refitted only when the CSV changes
+        recommended_jobs = await thread_pool.run(job_index.recommend, skills, k=5)
 
         return {
             "recommended_jobs": recommended_jobs.to_dict(orient="records")
@@ -316,18 +582,24 @@ async def recommend_jobs(skills: List[str]):
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 @app.get("/job-analysis")
-async def jobs_analysis():
-    df = pd.read_csv("ai_job_market_insights.csv")
+async def jobs_analysis(request: Request, include_raw: bool = False):
     """Endpoint to return processed data for frontend"""
-    df=pd.read_csv("ai_job_market_insights.csv")
-    salary_by_title = df.groupby("Job_Title", as_index=False)["Salary_USD"].mean().sort_values(by="Salary_USD", ascending=False).to_dict('records')
-    industry_distribution = df["Industry"].value_counts().reset_index().rename(columns={"count": "value"}).to_dict('records')
-    
-    return {
-        "salary_by_title": salary_by_title,
-        "industry_distribution": industry_distribution,
-        "raw_data": df.to_dict('records')
-    }
+    # Aggregates are materialized once per CSV version; raw rows live at /job-analysis/raw
+    etag, payload = await thread_pool.run(job_analytics.summary, include_raw=include_raw)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=payload, media_type="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+@app.get("/job-analysis/raw")
+async def jobs_analysis_raw(request: Request, page: int = 1, page_size: int = 100, columns: Optional[str] = None):
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    try:
+        etag, body = await thread_pool.run(job_analytics.page, page=page, page_size=page_size, columns=selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(content=body, headers={"ETag": etag, "Cache-Control": "no-cache"})
 
 @app.post("/query")
 def handle_query(request: QueryRequest):
@@ -335,13 +607,165 @@ def handle_query(request: QueryRequest):
     if not query:
         raise HTTPException(status_code=400, detail="Query cannot be empty.")
     
-    retrieved = search_chunks(query, text_chunks, index)
+    corpus = rag.get()
+    # Pick up chunks ingested or deleted by other workers since the last query
+    corpus.refresh()
+    query_embedding = encoder_batcher.encode([query])
+    cached = answer_cache.lookup(query_embedding[0], corpus.version)
+    if cached is not None:
+        return {"answer": cached}
+    retrieved = search_chunks(query_embedding, corpus)
     response = query_groq(query, retrieved)
+    answer_cache.put(query_embedding[0], response, corpus.version)
     return {"answer": response}
 
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/query/stream")
+async def handle_query_stream(request: QueryRequest):
+    """Server-sent events: one `context` event, then `token` events, then `done` (or `error`)."""
+    query = request.query.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="Query cannot be empty.")
+
+    start = time.perf_counter()
+    corpus = await thread_pool.run(rag.get)
+    await thread_pool.run(corpus.refresh)
+    query_embedding = await encoder_batcher.encode_async([query])
+    version = corpus.version
+    cached = answer_cache.lookup(query_embedding[0], version)
+    # search takes the corpus lock, which an ingest may hold, so keep it off the event loop
+    retrieved = [] if cached is not None else await thread_pool.run(search_chunks, query_embedding, corpus)
+    retrieval_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    async def events():
+        yield sse_event("context", {
+            "cached": cached is not None,
+            "retrieval_ms": retrieval_ms,
+            "chunks": [chunk[:200] for chunk in retrieved],
+        })
+        if cached is not None:
+            yield sse_event("token", {"text": cached})
+            yield sse_event("done", {})
+            return
+        parts = []
+        try:
+            async for token in stream_groq(query, retrieved):
+                parts.append(token)
+                yield sse_event("token", {"text": token})
+        except groq.GroqError as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
+        answer_cache.put(query_embedding[0], "".join(parts).strip(), version)
+        yield sse_event("done", {})
+
+    # X-Accel-Buffering stops nginx-style proxies from holding tokens back
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Only files that ship with the backend can be ingested through the API
+INGEST_FILES = {"jobs_csv": (JOB_DATA_FILE, job_chunks), "coursera_csv": ("Coursera.csv", course_chunks)}
+# Ingestion changes the corpus every user's answers come from, so `python ingest.py` is the
+# main path; HTTP ingestion is off unless INGEST_ADMIN_TOKEN is set and sent as X-Admin-Token
+INGEST_ADMIN_TOKEN = os.getenv("INGEST_ADMIN_TOKEN") or None
+
+def require_ingest_admin(x_admin_token: Optional[str] = Header(None)):
+    if INGEST_ADMIN_TOKEN is None:
+        raise HTTPException(status_code=403, detail="HTTP ingestion is disabled; use ingest.py.")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, INGEST_ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Missing or invalid X-Admin-Token.")
+
+@app.post("/ingest", dependencies=[Depends(require_ingest_admin)])
+def ingest_chunks(request: IngestRequest):
+    if request.kind == "text":
+        if not request.text or not request.source:
+            raise HTTPException(status_code=400, detail="Text ingestion needs both text and source.")
+        chunks = text_chunks_from(request.text, request.source, chunk_rag_documents)
+    elif request.kind in INGEST_FILES:
+        path, load_chunks = INGEST_FILES[request.kind]
+        chunks = load_chunks(path)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown kind; expected text or one of {sorted(INGEST_FILES)}.")
+    corpus = rag.get()
+    summary = corpus.ingest(chunks)
+    return {**summary, "corpus": corpus.stats()}
+
+@app.delete("/ingest/{chunk_id}", dependencies=[Depends(require_ingest_admin)])
+def delete_chunk(chunk_id: int):
+    corpus = rag.get()
+    if not corpus.delete([chunk_id]):
+        raise HTTPException(status_code=404, detail="Unknown chunk id.")
+    return {"deleted": chunk_id, "corpus": corpus.stats()}
+
+@app.get("/ingest-stats")
+def ingest_stats():
+    corpus = rag.get()
+    corpus.refresh()
+    return corpus.stats()
+
 @app.get("/")
 async def root():
     return {"message": "Career and Certificate Verification API"}
+
+@app.get("/models")
+async def models_report():
+    return registry.stats()
+
+@app.get("/cache-stats")
+async def cache_stats():
+    results = await thread_pool.run(result_cache.stats) if result_cache.persistent else result_cache.stats()
+    return {
+        "phrase_embeddings": phrase_cache.stats(),
+        "results": results,
+        "answers": answer_cache.stats(),
+    }
+
+@app.get("/pool-stats")
+async def pool_stats():
+    return {"threads": thread_pool.stats(), "processes": process_pool.stats(), "ocr": ocr_engine.pool.stats()}
+
+@app.get("/encoder-stats")
+async def encoder_stats():
+    return encoder_batcher.stats()
+
+@app.get("/career-model")
+async def career_model_report():
+    return career_model.get().stats()
+
+@app.get("/ocr-stats")
+async def ocr_stats():
+    return ocr_engine.stats()
+
+@app.on_event("startup")
+async def start_encoder_batcher():
+    encoder_batcher.start()
+    ocr_engine.start()
+
+@app.on_event("shutdown")
+async def shutdown_pools():
+    await encoder_batcher.stop()
+    await ocr_engine.stop()
+    thread_pool.shutdown()
+    process_pool.shutdown()
+
+@app.get("/startup-report")
+async def get_startup_report():
+    return startup_report()
+
+@app.post("/warmup")
+def warmup_subsystems(names: Optional[List[str]] = None):
+    try:
+        return warmup(names)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=e.args[0])
+
+@app.on_event("startup")
+def warmup_on_startup():
+    # e.g. WARMUP_SUBSYSTEMS=encoder,rag or WARMUP_SUBSYSTEMS=all
+    names = [n.strip() for n in os.getenv("WARMUP_SUBSYSTEMS", "").split(",") if n.strip()]
+    if names:
+        warmup(names)
     
 # --career recommandation
 
@@ -408,11 +832,22 @@ roles = [
      "skills": ["Figma", "Adobe XD", "User Research", "Wireframing", "Prototyping", "Sketch"]}
 ]
 
-df_roles = pd.DataFrame(roles)
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# Role and role-skill embeddings are computed once and never mutated per request
+role_catalog = subsystem("roles", lambda: RoleCatalog.build(roles, encoder.get()))
 
 coursera_df = pd.read_csv("Coursera.csv")
 
+# Every unique course skill is embedded once; prebuilt by `python course_index.py`
+def load_course_index():
+    index = CourseSkillIndex.load_or_build(
+        coursera_df, encoder.get(), path=artifact_store.path("course_skill_index.npz"),
+        model_name=DEFAULT_MODEL, source_path="Coursera.csv", lock=artifact_store.locked
+    )
+    ratings = pd.to_numeric(coursera_df["rating"], errors="coerce").fillna(0.0).to_numpy()
+    return index, ratings
+
+course_catalog = subsystem("course_index", load_course_index)
+
 class UserProfile(BaseModel):
     name: str
     current_skills: List[str]
@@ -441,81 +876,50 @@ class RecommendationResponse(BaseModel):
 @app.post("/recommend-career-path", response_model=RecommendationResponse)
 def recommend_career_path(desired_skils : List[str]):
         # Step 1: Recommend career roles based on desired skills
-        user_input = desired_skils
-        role_texts = [role['title'] + " " + role['description'] + " " + " ".join(role['skills']) for role in roles]
-        role_embeddings = model.encode(role_texts)
-        user_embedding = model.encode([user_input])
-        similarities = cosine_similarity(user_embedding, role_embeddings)[0]
-        
-        df_roles["match_score"] = similarities
-        df_roles_sorted = df_roles.sort_values(by="match_score", ascending=False).reset_index(drop=True)
-        df_rec_course = df_roles_sorted.head(5)  # Get top 5 roles
-        
+        user_input = ", ".join(desired_skils)
+        catalog = role_catalog.get()
+        course_index, course_ratings = course_catalog.get()
+        user_embedding = phrase_cache.encode([user_input])
+        top_roles = catalog.top_k(user_embedding, k=5)  # Get top 5 roles
+
         # Step 2: Get course recommendations for each role
         recommendations = []
-        for _, role in df_rec_course.iterrows():
-            role_skills = [s.strip() for s in role["skills"]]
-            role_skill_embeddings = model.encode(role_skills)
-            
-            recommended_courses = []
-            for _, course in coursera_df.iterrows():
-                course_skills = str(course["skills"]).split(",")
-                course_skills_cleaned = [s.strip() for s in course_skills]
-                
-                if not course_skills_cleaned:
-                    continue
-                
-                course_skill_embeddings = model.encode(course_skills_cleaned)
-                sim_matrix = cosine_similarity(role_skill_embeddings, course_skill_embeddings)
-                max_sim = sim_matrix.max()
-                
-                if max_sim >= 0.5:  # similarity threshold
-                    try:
-                        course_rating = float(course["rating"])
-                    except:
-                        course_rating = 0.0
-                    
-                    recommended_courses.append({
-                        "course": course["course"],
-                        "skills": course["skills"],
-                        "rating": course_rating,
-                        "reviewcount": course.get("reviewcount", "N/A"),
-                        "duration": course.get("duration", "N/A"),
-                        "similarity": round(float(max_sim), 3)
-                    })
-            
-            # Sort and get top 5 courses
-            sorted_courses = sorted(recommended_courses, 
-                                  key=lambda x: (x["similarity"], x["rating"]), 
-                                  reverse=True)[:5]
-            
+        for role_idx, match_score in top_roles:
+            # One matrix product over all course skills, then a max per course
+            course_sims = course_index.max_similarity(catalog.skill_embeddings[role_idx])
+            candidates = np.flatnonzero(course_sims >= 0.5)  # similarity threshold
+            rounded_sims = np.round(course_sims[candidates].astype(np.float64), 3)
+            order = np.lexsort((candidates, -course_ratings[candidates], -rounded_sims))[:5]
+
+            sorted_courses = []
+            for pos in order:
+                course = coursera_df.iloc[candidates[pos]]
+                sorted_courses.append({
+                    "course": course["course"],
+                    "skills": course["skills"],
+                    "rating": float(course_ratings[candidates[pos]]),
+                    "reviewcount": course.get("reviewcount", "N/A"),
+                    "duration": course.get("duration", "N/A"),
+                    "similarity": float(rounded_sims[pos])
+                })
+
             recommendations.append({
-                "career_role": role["title"],
-                "match_score": float(role["match_score"]),
+                "career_role": catalog.role(role_idx)["title"],
+                "match_score": match_score,
                 "recommended_courses": sorted_courses
             })
-        
+
         return {"recommended_careers": recommendations}
 
-model = SentenceTransformer('all-MiniLM-L6-v2')    
 class SkillInput(BaseModel):
     skills: str  # e.g. "Machine Learning, Deep Learning, Data Science"
 
 @app.post("/recommend-roles")
 def recommend_roles(user_input: SkillInput):
-    df_roles = pd.DataFrame(roles)
-
-    # Create embeddings
-    role_texts = [
-        f"{role['title']} {role['description']} {' '.join(role['skills'])}" for role in roles
-    ]
-    role_embeddings = model.encode(role_texts)
-    user_embedding = model.encode([user_input.skills])
-
-    # Compute similarity
-    similarities = cosine_similarity(user_embedding, role_embeddings)[0]
-    df_roles["match_score"] = similarities
-    df_roles_sorted = df_roles.sort_values(by="match_score", ascending=False).reset_index(drop=True)
-    top_roles = df_roles_sorted.head(5).to_dict(orient="records")
+    user_embedding = phrase_cache.encode([user_input.skills])
+    # Single dot product against the precomputed role matrix
+    top_roles = role_catalog.get().recommend(user_embedding, k=5)
 
     return {"recommended_roles": top_roles}
+
+mark_app_ready()
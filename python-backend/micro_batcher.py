@@ -0,0 +1,155 @@
+"""Dynamic micro-batching in front of the shared encoder.
+
+Concurrent encode requests are queued. The batching loop waits up to
+max_wait_ms, or until max_batch_items texts are pending, then runs one
+forward pass on a dedicated encoder thread and hands each caller its slice
+of the result. Batch-size and queue-wait histograms show how to tune the
+latency/throughput trade-off.
+
+Coroutines call `await encode_async(texts)`. Code running on worker threads
+calls `encode(texts)`, which goes through the same queue. Before the loop is
+started, or when called from the event-loop thread, encode() falls back to
+a direct model call.
+"""
+import asyncio
+import bisect
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+WAIT_MS_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 250, 500, 1000]
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.samples = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.samples += 1
+
+    def snapshot(self):
+        labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.samples,
+            "mean": round(self.total / self.samples, 3) if self.samples else None,
+        }
+
+
+class MicroBatcher:
+    def __init__(self, encode_fn, max_batch_items=64, max_wait_ms=5.0):
+        """encode_fn(list_of_texts) -> array of shape (n, dim)."""
+        self._encode_fn = encode_fn
+        self.max_batch_items = max_batch_items
+        self.max_wait_ms = max_wait_ms
+        self._queue = None
+        self._loop = None
+        self._task = None
+        # One forward pass at a time, on a thread no caller can be blocking
+        self._runner = ThreadPoolExecutor(1, thread_name_prefix="encoder-batch")
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_ms = Histogram(WAIT_MS_BUCKETS)
+        self.forward_ms = Histogram(WAIT_MS_BUCKETS)
+
+    def start(self, loop=None):
+        self._loop = loop or asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._loop = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def encode_async(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if not self.running:
+            return await asyncio.get_running_loop().run_in_executor(self._runner, self._direct, texts)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future, time.perf_counter()))
+        return await future
+
+    def encode(self, texts, **_):
+        """Blocking entry point for worker threads; same signature as model.encode."""
+        texts = list(texts)
+        loop = self._loop
+        in_loop_thread = False
+        if loop is not None:
+            try:
+                in_loop_thread = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                pass
+        if not self.running or in_loop_thread:
+            return self._direct(texts)
+        return asyncio.run_coroutine_threadsafe(self.encode_async(texts), loop).result()
+
+    def _direct(self, texts):
+        return np.asarray(self._encode_fn(texts), dtype=np.float32)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while size < self.max_batch_items:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            now = time.perf_counter()
+            texts = []
+            for item_texts, _, enqueued_at in pending:
+                texts.extend(item_texts)
+                self.wait_ms.observe(1000 * (now - enqueued_at))
+            self.batch_sizes.observe(len(texts))
+
+            try:
+                vectors = await loop.run_in_executor(self._runner, self._direct, texts)
+            except Exception as e:
+                for _, future, _ in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.forward_ms.observe(1000 * (time.perf_counter() - now))
+
+            offset = 0
+            for item_texts, future, _ in pending:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "max_batch_items": self.max_batch_items,
+            "max_wait_ms": self.max_wait_ms,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.wait_ms.snapshot(),
+            "forward_ms": self.forward_ms.snapshot(),
+        }
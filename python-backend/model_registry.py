@@ -0,0 +1,85 @@
+"""Process-wide registry of SentenceTransformer encoders.
+
+Each named encoder is loaded once per worker and shared by every endpoint.
+The registry records how long each load took and how much memory it added so
+we can size the number of uvicorn workers per node.
+"""
+import threading
+import time
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+HUB_PREFIX = "sentence-transformers/"
+
+
+def canonical_name(name):
+    # "sentence-transformers/all-MiniLM-L6-v2" and "all-MiniLM-L6-v2" are the same checkpoint
+    return name[len(HUB_PREFIX):] if name.startswith(HUB_PREFIX) else name
+
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def parameter_bytes(model):
+    try:
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+    except AttributeError:
+        return None
+
+
+def load_sentence_transformer(name):
+    # Imported here so that importing the registry does not pull in torch
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+class ModelRegistry:
+    def __init__(self, loader=load_sentence_transformer):
+        self._loader = loader
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, name=DEFAULT_MODEL):
+        name = canonical_name(name)
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if name not in self._models:
+                rss_before = current_rss_bytes()
+                start = time.perf_counter()
+                model = self._loader(name)
+                param_bytes = parameter_bytes(model)
+                self._stats[name] = {
+                    "load_seconds": round(time.perf_counter() - start, 3),
+                    "rss_delta_mb": round((current_rss_bytes() - rss_before) / 2**20, 1),
+                    "parameter_mb": None if param_bytes is None else round(param_bytes / 2**20, 1),
+                    "dimension": model.get_sentence_embedding_dimension(),
+                }
+                self._models[name] = model
+            return self._models[name]
+
+    def loaded(self):
+        return list(self._models)
+
+    def stats(self):
+        return {
+            "models": {name: dict(stats) for name, stats in self._stats.items()},
+            "process_rss_mb": round(current_rss_bytes() / 2**20, 1),
+        }
+
+
+registry = ModelRegistry()
+
+
+def get_encoder(name=DEFAULT_MODEL):
+    return registry.get(name)
@@ -0,0 +1,209 @@
+"""Pooled, batched OCR for certificate images.
+
+OCR runs in its own pool of spawned processes, each holding one PaddleOCR
+engine, so it neither contends for the GIL nor shares a non-thread-safe
+engine between requests, and a burst of images cannot starve PDF parsing in
+the general process pool. Concurrent requests are collected for up to
+OCR_BATCH_MAX_WAIT_MS and shipped to a worker as one task.
+
+Images are decoded at reduced size where the format allows it, EXIF-rotated
+and downscaled so the longest side is at most OCR_MAX_SIDE before text
+detection. Callers that know the image is upright can skip the angle
+classifier, and can restrict OCR to a region of the image given as
+fractions of its width and height. Decode, detect, classify and recognize times are recorded per
+image and exposed through stats().
+"""
+import asyncio
+import io
+import os
+import time
+
+import numpy as np
+
+from executor import WorkerPool
+from micro_batcher import BATCH_SIZE_BUCKETS, Histogram
+
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "1600"))
+STAGE_MS_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+STAGES = ("decode", "detect", "classify", "recognize")
+
+_engine = None
+_use_angle_cls = True
+
+
+def get_ocr(use_angle_cls=True):
+    global _engine
+    if _engine is None:
+        from paddleocr import PaddleOCR
+        _engine = PaddleOCR(use_angle_cls=use_angle_cls, lang='en', show_log=False)
+    return _engine
+
+
+def init_ocr_worker(warm=False, use_angle_cls=True):
+    """OCR pool initializer; optionally load the models before the first request."""
+    global _use_angle_cls
+    _use_angle_cls = use_angle_cls
+    if warm:
+        get_ocr(use_angle_cls)
+
+
+def parse_region(value):
+    """"left,top,right,bottom" fractions -> tuple, or None for the whole image."""
+    if not value:
+        return None
+    region = tuple(float(v) for v in value.split(","))
+    if len(region) != 4 or not (0 <= region[0] < region[2] <= 1 and 0 <= region[1] < region[3] <= 1):
+        raise ValueError(f"Invalid OCR region {value!r}; expected left,top,right,bottom fractions.")
+    return region
+
+
+def complement_regions(region, overlap=0.0):
+    """Strips covering the rest of the image around `region`, each reaching `overlap` into it."""
+    left, top, right, bottom = region
+    strips = []
+    if top > 0:
+        strips.append((0.0, 0.0, 1.0, min(1.0, top + overlap)))
+    if bottom < 1:
+        strips.append((0.0, max(0.0, bottom - overlap), 1.0, 1.0))
+    if left > 0:
+        strips.append((0.0, top, min(1.0, left + overlap), bottom))
+    if right < 1:
+        strips.append((max(0.0, right - overlap), top, 1.0, bottom))
+    return [tuple(round(edge, 4) for edge in strip) for strip in strips]
+
+
+def decode_image(image_bytes, max_side=OCR_MAX_SIDE, region=None):
+    """Upright BGR array of `region` (whole image if None), longest side at most max_side."""
+    from PIL import Image, ImageOps
+    image = Image.open(io.BytesIO(image_bytes))
+    # JPEG can decode straight to a reduced scale, which is much cheaper than resizing after
+    image.draft("RGB", (max_side, max_side))
+    image = ImageOps.exif_transpose(image)
+    if region is not None:
+        width, height = image.size
+        left, top, right, bottom = region
+        image = image.crop((int(left * width), int(top * height), int(right * width), int(bottom * height)))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    return np.ascontiguousarray(np.asarray(image)[:, :, ::-1])
+
+
+def recognize(image_bytes, upright=False, max_side=OCR_MAX_SIDE, region=None):
+    """(text, {stage: ms}) for one image, in the calling process."""
+    start = time.perf_counter()
+    image = decode_image(image_bytes, max_side, region)
+    timings = {"decode": 1000 * (time.perf_counter() - start)}
+    engine = get_ocr(_use_angle_cls)
+    use_cls = _use_angle_cls and not upright
+    # TextSystem.__call__ returns per-stage times that PaddleOCR.ocr() discards; this is
+    # the PaddleOCR 2.7+ (boxes, rec_res, times) API, pinned below 3 in requirements.txt
+    boxes, rec_res, stage_seconds = engine(image, cls=use_cls)
+    # rec_res is None when no text was detected
+    lines = [text for text, _ in rec_res or []]
+    timings["detect"] = 1000 * stage_seconds.get("det", 0.0)
+    timings["classify"] = 1000 * stage_seconds.get("cls", 0.0)
+    timings["recognize"] = 1000 * stage_seconds.get("rec", 0.0)
+    return "\n".join(lines), timings
+
+
+def recognize_batch(jobs, max_side=OCR_MAX_SIDE):
+    """Worker task: OCR several (image bytes, upright, region) jobs in one round trip."""
+    return [recognize(image, upright, max_side, region) for image, upright, region in jobs]
+
+
+class OcrEngine:
+    def __init__(self, max_workers=2, max_queue=8, max_batch_items=4, max_wait_ms=10.0,
+                 max_side=OCR_MAX_SIDE, use_angle_cls=True, warm=False):
+        self.pool = WorkerPool(
+            "ocr", "process", max_workers=max_workers, max_queue=max_queue,
+            initializer=init_ocr_worker, initargs=(warm, use_angle_cls)
+        )
+        self.max_batch_items = max_batch_items
+        self.max_wait_ms = max_wait_ms
+        self.max_side = max_side
+        self.use_angle_cls = use_angle_cls
+        self._queue = None
+        self._task = None
+        self._dispatches = set()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.stage_ms = {stage: Histogram(STAGE_MS_BUCKETS) for stage in STAGES}
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self.pool.shutdown()
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def extract_text(self, image_bytes, upright=False, region=None):
+        job = (image_bytes, upright, region)
+        if not self.running:
+            [result] = await self._recognize([job])
+            return result
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    async def _recognize(self, jobs):
+        self.batch_sizes.observe(len(jobs))
+        results = await self.pool.run(recognize_batch, jobs, self.max_side)
+        for _, timings in results:
+            for stage, ms in timings.items():
+                self.stage_ms[stage].observe(ms)
+        return [text for text, _ in results]
+
+    async def _dispatch(self, pending):
+        try:
+            texts = await self._recognize([job for job, _ in pending])
+        except Exception as e:
+            # PoolSaturated included, so callers still get a 503
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), text in zip(pending, texts):
+            if not future.done():
+                future.set_result(text)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(pending) < self.max_batch_items:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Batches run concurrently, up to the pool's worker count
+            task = loop.create_task(self._dispatch(pending))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "max_batch_items": self.max_batch_items,
+            "max_wait_ms": self.max_wait_ms,
+            "max_side": self.max_side,
+            "angle_classifier": self.use_angle_cls,
+            "batch_size": self.batch_sizes.snapshot(),
+            "stage_ms": {stage: h.snapshot() for stage, h in self.stage_ms.items()},
+            "pool": self.pool.stats(),
+        }
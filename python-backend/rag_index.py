@@ -0,0 +1,186 @@
+"""FAISS index factory for the chatbot retrieval corpus.
+
+Supported kinds:
+    flat-l2  exact L2 scan (the original IndexFlatL2)
+    flat-ip  exact inner product on L2-normalized vectors (cosine)
+    hnsw     graph index, inner product on normalized vectors
+    ivfpq    inverted lists with product-quantized codes, for very large corpora
+
+The kind and its parameters come from RAG_INDEX_* environment variables and
+are recorded in the artifact manifest, so changing them triggers a rebuild.
+
+CLI:
+    python rag_index.py build --kind hnsw
+    python rag_index.py bench --kinds flat-ip,hnsw,ivfpq --k 5 --queries 200
+"""
+import argparse
+import math
+import os
+import time
+
+import faiss
+import numpy as np
+
+INDEX_KINDS = ("flat-l2", "flat-ip", "hnsw", "ivfpq")
+
+
+def index_spec_from_env():
+    return {
+        "kind": os.getenv("RAG_INDEX_KIND", "flat-ip"),
+        "hnsw_m": int(os.getenv("RAG_HNSW_M", "32")),
+        "hnsw_ef_construction": int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "200")),
+        "hnsw_ef_search": int(os.getenv("RAG_HNSW_EF_SEARCH", "64")),
+        "ivf_nlist": int(os.getenv("RAG_IVF_NLIST", "1024")),
+        "ivf_nprobe": int(os.getenv("RAG_IVF_NPROBE", "16")),
+        "pq_m": int(os.getenv("RAG_PQ_M", "48")),
+        "pq_nbits": int(os.getenv("RAG_PQ_NBITS", "8")),
+    }
+
+
+def uses_inner_product(spec):
+    return spec["kind"] != "flat-l2"
+
+
+def prepare_vectors(vectors, spec):
+    """float32 copy, L2-normalized for the inner-product kinds."""
+    vectors = np.array(vectors, dtype=np.float32, copy=True)
+    if uses_inner_product(spec):
+        faiss.normalize_L2(vectors)
+    return vectors
+
+
+def build_index(vectors, spec, ids=None):
+    """Index over `vectors` addressed by `ids` (default 0..n-1), ready for add_with_ids/remove_ids."""
+    kind = spec["kind"]
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"Unknown RAG index kind {kind!r}; expected one of {INDEX_KINDS}.")
+    vectors = prepare_vectors(vectors, spec)
+    n, d = vectors.shape
+
+    # Flat and HNSW indexes only number vectors positionally, so wrap them in an id map
+    if kind == "flat-l2":
+        index = faiss.IndexIDMap2(faiss.IndexFlatL2(d))
+    elif kind == "flat-ip":
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(d))
+    elif kind == "hnsw":
+        hnsw = faiss.IndexHNSWFlat(d, spec["hnsw_m"], faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = spec["hnsw_ef_construction"]
+        index = faiss.IndexIDMap2(hnsw)
+    else:
+        # Shrink the coarse and PQ codebooks for small corpora so training has enough points
+        nlist = max(1, min(spec["ivf_nlist"], n // 39))
+        nbits = max(1, min(spec["pq_nbits"], int(math.log2(max(n // 39, 2)))))
+        pq_m = spec["pq_m"] if d % spec["pq_m"] == 0 else 8
+        quantizer = faiss.IndexFlatIP(d)
+        index = faiss.IndexIVFPQ(quantizer, d, nlist, pq_m, nbits, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+
+    ids = np.arange(n, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+    index.add_with_ids(vectors, ids)
+    configure_search(index, spec)
+    return index
+
+
+def _unwrap(index):
+    index = faiss.downcast_index(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def configure_search(index, spec):
+    """Apply query-time knobs, which are not always preserved by write_index."""
+    if spec["kind"] == "hnsw":
+        _unwrap(index).hnsw.efSearch = spec["hnsw_ef_search"]
+    elif spec["kind"] == "ivfpq":
+        faiss.extract_index_ivf(index).nprobe = spec["ivf_nprobe"]
+    return index
+
+
+def supports_removal(spec):
+    # HNSW graphs cannot drop nodes; deleted ids are filtered at query time instead
+    return spec["kind"] != "hnsw"
+
+
+def search(index, query_vectors, spec, top_k):
+    return index.search(prepare_vectors(np.atleast_2d(query_vectors), spec), top_k)
+
+
+def benchmark(vectors, specs, queries, top_k=5):
+    """Recall@k against exact cosine search, build time and per-query latency for each spec."""
+    exact_spec = {"kind": "flat-ip"}
+    exact = build_index(vectors, exact_spec)
+    _, truth = search(exact, queries, exact_spec, top_k)
+
+    results = []
+    for spec in specs:
+        start = time.perf_counter()
+        index = build_index(vectors, spec)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        found = np.empty_like(truth)
+        for i, query in enumerate(queries):
+            start = time.perf_counter()
+            _, ids = search(index, query, spec, top_k)
+            latencies.append(1000 * (time.perf_counter() - start))
+            found[i] = ids[0]
+
+        hits = sum(len(set(found[i]) & set(truth[i])) for i in range(len(queries)))
+        results.append({
+            "kind": spec["kind"],
+            f"recall@{top_k}": round(hits / truth.size, 4),
+            "build_seconds": round(build_seconds, 3),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 4),
+        })
+    return results
+
+
+def _load_corpus():
+    from main import TEXT_FILE, encoder, load_text_chunks
+    chunks = list(load_text_chunks(TEXT_FILE))
+    return chunks, encoder.get()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or benchmark the RAG FAISS index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = sub.add_parser("build", help="Encode the corpus and persist an index of the given kind.")
+    build_cmd.add_argument("--kind", choices=INDEX_KINDS)
+
+    bench_cmd = sub.add_parser("bench", help="Compare recall@k and latency against the exact index.")
+    bench_cmd.add_argument("--kinds", default="flat-ip,hnsw,ivfpq")
+    bench_cmd.add_argument("--k", type=int, default=5)
+    bench_cmd.add_argument("--queries", type=int, default=200)
+    bench_cmd.add_argument("--queries-file", help="One query per line; defaults to perturbed corpus vectors.")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if args.kind:
+            os.environ["RAG_INDEX_KIND"] = args.kind
+        import main as app_main
+        index = app_main.rag.get().index
+        print(f"{os.environ.get('RAG_INDEX_KIND', 'flat-ip')} index with {index.ntotal} vectors: "
+              f"{app_main.artifact_store.last_load}")
+        return
+
+    chunks, model = _load_corpus()
+    vectors = model.encode(chunks, convert_to_numpy=True)
+    rng = np.random.default_rng(0)
+    if args.queries_file:
+        with open(args.queries_file, "r", encoding="utf-8") as f:
+            queries = model.encode([line.strip() for line in f if line.strip()], convert_to_numpy=True)
+    else:
+        sample = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+        queries = vectors[sample] + rng.normal(scale=0.05, size=(len(sample), vectors.shape[1]))
+    queries = queries.astype(np.float32)
+
+    specs = [dict(index_spec_from_env(), kind=kind.strip()) for kind in args.kinds.split(",")]
+    for row in benchmark(vectors, specs, queries, args.k):
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Content-addressed cache for extracted text, OCR output and skills.
+
+Entries are keyed by the SHA-256 of the uploaded bytes (plus any parameters
+that change the result), so re-uploads of the same file skip extraction
+entirely. A size-bounded in-memory LRU sits in front of an optional SQLite
+tier that survives restarts and is shared by workers on the same host.
+SQLite calls block, so async callers should run get/set through a thread
+pool when the cache is persistent. The disk tier's total size is kept in a
+one-row table maintained by triggers, so writes never scan the table.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_key(data, *params):
+    digest = hashlib.sha256(data)
+    for param in params:
+        digest.update(b"\0" + str(param).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_memory_bytes=64 * 2**20, sqlite_path=None, max_disk_bytes=512 * 2**20):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.sqlite_path = sqlite_path
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+            # One transaction, so a worker starting concurrently cannot count rows twice
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL)")
+            self._db.execute("INSERT OR IGNORE INTO totals VALUES (0, (SELECT COALESCE(SUM(size), 0) FROM results))")
+            self._db.execute(
+                "CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results"
+                " BEGIN UPDATE totals SET size = size + NEW.size WHERE id = 0; END"
+            )
+            self._db.execute(
+                "CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results"
+                " BEGIN UPDATE totals SET size = size - OLD.size WHERE id = 0; END"
+            )
+            self._db.execute(
+                "CREATE TRIGGER IF NOT EXISTS results_resize AFTER UPDATE OF size ON results"
+                " BEGIN UPDATE totals SET size = size + NEW.size - OLD.size WHERE id = 0; END"
+            )
+            self._db.execute("COMMIT")
+
+    @property
+    def persistent(self):
+        return self._db is not None
+
+    def _remember(self, mem_key, blob):
+        old = self._memory.pop(mem_key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        if len(blob) > self.max_memory_bytes:
+            return
+        self._memory[mem_key] = blob
+        self._memory_bytes += len(blob)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def get(self, namespace, key):
+        mem_key = (namespace, key)
+        with self._lock:
+            blob = self._memory.get(mem_key)
+            if blob is not None:
+                self._memory.move_to_end(mem_key)
+                self.hits["memory"] += 1
+                return json.loads(blob)
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM results WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE results SET last_access = ? WHERE namespace = ? AND key = ?",
+                        (time.time(), namespace, key)
+                    )
+                    self._remember(mem_key, row[0])
+                    self.hits["disk"] += 1
+                    return json.loads(row[0])
+            self.misses += 1
+            return None
+
+    def set(self, namespace, key, value):
+        blob = json.dumps(value).encode("utf-8")
+        with self._lock:
+            self._remember((namespace, key), blob)
+            if self._db is not None:
+                # An upsert rather than INSERT OR REPLACE: REPLACE's implicit delete skips the triggers
+                self._db.execute(
+                    "INSERT INTO results (namespace, key, value, size, last_access) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (namespace, key) DO UPDATE SET"
+                    " value = excluded.value, size = excluded.size, last_access = excluded.last_access",
+                    (namespace, key, blob, len(blob), time.time())
+                )
+                self._evict_disk()
+
+    def _evict_disk(self):
+        total = self._db.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        # Drop least recently used rows until the tier is back under budget
+        freed = 0
+        stale = []
+        for namespace, key, size in self._db.execute(
+            "SELECT namespace, key, size FROM results ORDER BY last_access"
+        ):
+            stale.append((namespace, key))
+            freed += size
+            if total - freed <= self.max_disk_bytes:
+                break
+        self._db.executemany("DELETE FROM results WHERE namespace = ? AND key = ?", stale)
+
+    def stats(self):
+        stats = {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "max_memory_bytes": self.max_memory_bytes,
+            "hits": dict(self.hits),
+            "misses": self.misses,
+        }
+        if self._db is not None:
+            with self._lock:
+                count = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+                size = self._db.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+            stats.update(disk_entries=count, disk_bytes=size, max_disk_bytes=self.max_disk_bytes)
+        return stats
+
+
+def from_env():
+    return ResultCache(
+        max_memory_bytes=int(os.getenv("RESULT_CACHE_MEMORY_BYTES", str(64 * 2**20))),
+        sqlite_path=os.getenv("RESULT_CACHE_SQLITE") or None,
+        max_disk_bytes=int(os.getenv("RESULT_CACHE_DISK_BYTES", str(512 * 2**20))),
+    )
@@ -0,0 +1,58 @@
+"""Immutable catalogue of career roles with precomputed embeddings.
+
+Role texts and per-role skill lists are encoded once. Ranking roles for a
+user is a single dot product against the normalized role matrix, and
+results are fresh dicts, so concurrent requests never share mutable state.
+"""
+import numpy as np
+
+from vector_utils import normalize_rows, top_k_indices
+
+
+def role_text(role):
+    return f"{role['title']} {role['description']} {' '.join(role['skills'])}"
+
+
+def _frozen(array):
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    array.setflags(write=False)
+    return array
+
+
+class RoleCatalog:
+    def __init__(self, roles, role_embeddings, skill_embeddings):
+        self._roles = tuple(
+            {"title": r["title"], "description": r["description"], "skills": tuple(r["skills"])}
+            for r in roles
+        )
+        self.role_embeddings = _frozen(normalize_rows(role_embeddings))
+        self.skill_embeddings = tuple(_frozen(normalize_rows(e)) for e in skill_embeddings)
+
+    @classmethod
+    def build(cls, roles, model):
+        role_embeddings = model.encode([role_text(r) for r in roles], convert_to_numpy=True)
+
+        # Encode every role skill in one batch, then slice it back per role
+        all_skills = [s.strip() for r in roles for s in r["skills"]]
+        flat = model.encode(all_skills, convert_to_numpy=True)
+        bounds = np.cumsum([0] + [len(r["skills"]) for r in roles])
+        skill_embeddings = [flat[bounds[i]:bounds[i + 1]] for i in range(len(roles))]
+        return cls(roles, role_embeddings, skill_embeddings)
+
+    def __len__(self):
+        return len(self._roles)
+
+    def role(self, idx):
+        role = self._roles[idx]
+        return {"title": role["title"], "description": role["description"], "skills": list(role["skills"])}
+
+    def scores(self, user_embedding):
+        return self.role_embeddings @ normalize_rows(np.atleast_2d(user_embedding))[0]
+
+    def top_k(self, user_embedding, k=5):
+        """[(role index, cosine score)] for the k best matching roles, best first."""
+        scores = self.scores(user_embedding)
+        return [(int(i), float(scores[i])) for i in top_k_indices(scores, k)]
+
+    def recommend(self, user_embedding, k=5):
+        return [dict(self.role(i), match_score=score) for i, score in self.top_k(user_embedding, k)]
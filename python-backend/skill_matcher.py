@@ -0,0 +1,78 @@
+"""Vectorized matching of resume phrases against the known-skill list.
+
+Phrase and skill embeddings are L2-normalized, so all cosine similarities come
+from one matrix product; top-1 selection is a row-wise argmax plus a
+threshold mask.
+"""
+import threading
+
+import numpy as np
+
+from vector_utils import normalize_rows
+
+
+class SkillMatcher:
+    def __init__(self, skills, skill_embeddings):
+        self.skills = list(skills)
+        self.skill_embeddings = normalize_rows(skill_embeddings)
+
+    @classmethod
+    def from_encoder(cls, skills, model):
+        skills = list(skills)
+        return cls(skills, model.encode(skills, convert_to_numpy=True))
+
+    def similarities(self, phrase_embeddings):
+        """(n_phrases, n_skills) cosine similarity matrix."""
+        return normalize_rows(phrase_embeddings) @ self.skill_embeddings.T
+
+    def match_matrix(self, phrase_embeddings, doc_ids, num_docs, threshold=0.4):
+        """Boolean (num_docs, n_skills) matrix of top-1 matches.
+
+        Phrases from many documents are scored together; doc_ids[i] names the
+        document phrase i came from, so one phrase may serve several documents.
+        """
+        matrix = np.zeros((num_docs, len(self.skills)), dtype=bool)
+        if len(phrase_embeddings) == 0:
+            return matrix
+        sims = self.similarities(phrase_embeddings)
+        top_idx = sims.argmax(axis=1)
+        hit = sims[np.arange(len(top_idx)), top_idx] >= threshold
+        matrix[np.asarray(doc_ids)[hit], top_idx[hit]] = True
+        return matrix
+
+
+class SkillAccumulator:
+    """Skill matches for one document whose text arrives page by page.
+
+    Top-1 hits are a union over phrases and per-skill scores a running max,
+    so feeding pages in any order gives the same result as matching all
+    phrases at once.
+    """
+
+    def __init__(self, matcher, threshold=0.4):
+        self.matcher = matcher
+        self.threshold = threshold
+        self._hits = np.zeros(len(matcher.skills), dtype=bool)
+        self._best = np.full(len(matcher.skills), -np.inf, dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def add(self, phrase_embeddings):
+        if len(phrase_embeddings) == 0:
+            return
+        sims = self.matcher.similarities(phrase_embeddings)
+        top_idx = sims.argmax(axis=1)
+        top_score = sims[np.arange(len(top_idx)), top_idx]
+        best = sims.max(axis=0)
+        with self._lock:
+            self._hits[top_idx[top_score >= self.threshold]] = True
+            np.maximum(self._best, best, out=self._best)
+
+    def result(self):
+        """Sorted skill names, each the best match of some phrase."""
+        return sorted(self.matcher.skills[i] for i in np.flatnonzero(self._hits))
+
+    def scores(self):
+        """Every skill at or above the threshold against any phrase, best first."""
+        hits = np.flatnonzero(self._best >= self.threshold)
+        hits = hits[np.argsort(-self._best[hits], kind="stable")]
+        return [{"skill": self.matcher.skills[i], "score": round(float(self._best[i]), 4)} for i in hits]
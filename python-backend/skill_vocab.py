@@ -0,0 +1,89 @@
+"""Canonical skill vocabulary shared by the recommenders.
+
+Known resume skills and job Required_Skills are mapped to integer ids in
+one vocabulary, and skill sets travel as binary CSR rows over it.
+Resume-to-job and resume-to-cluster scoring are then sparse matrix products.
+
+Ids are append-only within a process, so rows encoded earlier stay valid
+(pad them with resize()). They are not stable across processes; anything
+persisted (e.g. the career model) stores skill names.
+"""
+import re
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from embedding_cache import normalize_phrase
+
+# Coursera.csv's skills column has review counts such as "(5.8k reviews)" mixed in
+_NOT_A_SKILL = re.compile(r"^\(.*\)$")
+
+
+def canonical_skill(name):
+    skill = normalize_phrase(name).strip(" \"'")
+    if not skill or _NOT_A_SKILL.match(skill):
+        return None
+    return skill
+
+
+def split_skills(raw):
+    """Comma-separated skills ("Python, Machine Learning") -> list of names."""
+    if not isinstance(raw, str):
+        return []
+    return [part for part in raw.split(",") if part.strip()]
+
+
+class SkillVocabulary:
+    def __init__(self, names=()):
+        self._ids = {}
+        self.names = []
+        self._lock = threading.Lock()
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        """Id of name, assigning a new one if needed; None if it is not a skill."""
+        skill = canonical_skill(name)
+        if skill is None:
+            return None
+        skill_id = self._ids.get(skill)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(skill)
+                if skill_id is None:
+                    skill_id = len(self.names)
+                    self.names.append(skill)
+                    self._ids[skill] = skill_id
+        return skill_id
+
+    def get(self, name):
+        skill = canonical_skill(name)
+        return None if skill is None else self._ids.get(skill)
+
+    def ids(self, skills, grow=False):
+        lookup = self.add if grow else self.get
+        return np.unique(np.array([i for i in map(lookup, skills) if i is not None], dtype=np.int64))
+
+    def encode(self, skill_sets, grow=False):
+        """Binary CSR matrix (len(skill_sets) x len(self)); unknown skills are dropped unless grow."""
+        indptr, indices = [0], []
+        for skills in skill_sets:
+            ids = self.ids(skills, grow)
+            indices.extend(ids.tolist())
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(skill_sets), len(self)))
+
+    def decode(self, row):
+        """Skill names of one CSR row."""
+        return [self.names[i] for i in row.indices]
+
+    def resize(self, matrix):
+        """Pad a CSR matrix encoded earlier to the current vocabulary width."""
+        if matrix.shape[1] == len(self):
+            return matrix
+        return sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], len(self)))
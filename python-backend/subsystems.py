@@ -0,0 +1,86 @@
+"""Lazily initialized heavy subsystems (OCR, RAG index, encoders, ...).
+
+A subsystem is built the first time an endpoint asks for it, or up front
+through warmup(). Every initialization is timed so /startup-report can break
+boot cost down by subsystem.
+"""
+import threading
+import time
+
+BOOT_STARTED = time.perf_counter()
+
+_subsystems = {}
+_app_ready_seconds = None
+
+
+class Subsystem:
+    def __init__(self, name, factory):
+        self.name = name
+        self._factory = factory
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.init_seconds = None
+        self.trigger = None
+        self.error = None
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self, trigger="on_demand"):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                try:
+                    self._value = self._factory()
+                except Exception as e:
+                    self.error = repr(e)
+                    raise
+                self.init_seconds = round(time.perf_counter() - start, 3)
+                self.trigger = trigger
+                self.error = None
+                self._loaded = True
+        return self._value
+
+    def report(self):
+        return {
+            "loaded": self._loaded,
+            "init_seconds": self.init_seconds,
+            "trigger": self.trigger,
+            "error": self.error,
+        }
+
+
+def subsystem(name, factory):
+    if name in _subsystems:
+        raise ValueError(f"Subsystem {name!r} is already registered.")
+    _subsystems[name] = Subsystem(name, factory)
+    return _subsystems[name]
+
+
+def warmup(names=None):
+    """Initialize the given subsystems (all of them when names is None or "all")."""
+    if names is None or names == "all" or "all" in names:
+        names = list(_subsystems)
+    for name in names:
+        if name not in _subsystems:
+            raise KeyError(f"Unknown subsystem {name!r}. Known: {sorted(_subsystems)}")
+        _subsystems[name].get(trigger="warmup")
+    return startup_report()
+
+
+def mark_app_ready():
+    global _app_ready_seconds
+    _app_ready_seconds = round(time.perf_counter() - BOOT_STARTED, 3)
+
+
+def startup_report():
+    subsystems = {name: s.report() for name, s in _subsystems.items()}
+    return {
+        "app_import_seconds": _app_ready_seconds,
+        "subsystems": subsystems,
+        "subsystem_init_seconds": round(sum(s.init_seconds or 0 for s in _subsystems.values()), 3),
+    }
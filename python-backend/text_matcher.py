@@ -0,0 +1,76 @@
+"""Aho-Corasick multi-pattern matcher used to spot course names in OCR text.
+
+The automaton is compiled once from the course catalogue; matching is a
+single linear pass over the text regardless of how many patterns it holds.
+"""
+import re
+from collections import deque
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize_text(text, loose=True):
+    """Lowercase; with loose=True also collapse punctuation/whitespace runs to one space."""
+    text = text.lower()
+    if loose:
+        text = _SEPARATORS.sub(" ", text).strip()
+    return text
+
+
+class MultiPatternMatcher:
+    def __init__(self, patterns, loose=True):
+        """`patterns` is an iterable of (key, pattern_text); keys may repeat."""
+        self.loose = loose
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self.num_patterns = 0
+        for key, pattern in patterns:
+            pattern = normalize_text(pattern, loose)
+            if pattern:
+                self._insert(pattern, key)
+                self.num_patterns += 1
+        self._link()
+
+    def _insert(self, pattern, key):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((key, len(pattern)))
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Inherit matches ending at the fallback state
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """Yield (key, start, end) for every occurrence, offsets into the normalized text."""
+        text = normalize_text(text, self.loose)
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for key, length in out[state]:
+                yield key, pos - length + 1, pos + 1
+
+    def find_keys(self, text):
+        """Set of keys whose pattern occurs anywhere in text."""
+        return {key for key, _, _ in self.iter_matches(text)}
@@ -10,7 +10,6 @@ import {
   Edit2,
 } from "lucide-react";
 import { motion } from "framer-motion";
-import axios from "axios";
 // import { BackgroundLines } from "@/app/component/ui/BackgroundLines";
 import ReactMarkdown from "react-markdown";
 
@@ -47,11 +46,39 @@ const Chatbot = () => {
 
   const messages = allChats[activeChat] || [];
 
-  async function apicall(userInput: string): Promise<string> {
-    const response = await axios.post("http://localhost:8000/query", {
-      query: userInput,
+  // Reads the server-sent events from /query/stream and reports the answer so far after each token
+  async function apicall(userInput: string, onText: (text: string) => void): Promise<string> {
+    const response = await fetch("http://localhost:8000/query/stream", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ query: userInput }),
     });
-    return response.data.answer;
+    if (!response.ok || !response.body) {
+      throw new Error(`Query failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let answer = "";
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split("\n\n");
+      buffer = events.pop() ?? "";
+      for (const raw of events) {
+        const event = raw.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] ?? "{}");
+        if (event === "token") {
+          answer += data.text;
+          onText(answer);
+        } else if (event === "error") {
+          throw new Error(data.detail);
+        }
+      }
+    }
+    return answer;
   }
 
   const createNewChat = () => {
@@ -138,12 +165,18 @@ const Chatbot = () => {
     setInput("");
     setFile(null);
 
-    const data = await apicall(input);
+    const showAnswer = (text: string) =>
+      setAllChats((prev) => ({
+        ...prev,
+        [activeChat]: [...newMessages, { text, sender: "bot" }],
+      }));
 
-    setAllChats((prev) => ({
-      ...prev,
-      [activeChat]: [...newMessages, { text: data, sender: "bot" }],
-    }));
+    try {
+      await apicall(input, showAnswer);
+    } catch (error) {
+      console.error("Error querying the chatbot:", error);
+      showAnswer("Sorry, something went wrong. Please try again.");
+    }
   };
 
   const formatChatTitle = (chatId: string, messages: Message[]): string => {
@@ -97,7 +97,24 @@ const JobInsights = () => {
           throw new Error('Network response was not ok');
         }
         const jobData = await response.json();
-        setData(jobData);
+
+        // Raw rows are paginated and projected to the columns the charts use
+        const columns = 'Job_Title,Salary_USD,Industry,Remote_Friendly,Automation_Risk,AI_Adoption_Level,Job_Growth_Projection';
+        const rawData: JobData[] = [];
+        let page = 1;
+        let totalPages = 1;
+        do {
+          const rawResponse = await fetch(`http://localhost:8000/job-analysis/raw?page=${page}&page_size=500&columns=${columns}`);
+          if (!rawResponse.ok) {
+            throw new Error('Network response was not ok');
+          }
+          const rawPage = await rawResponse.json();
+          rawData.push(...rawPage.rows);
+          totalPages = rawPage.total_pages;
+          page += 1;
+        } while (page <= totalPages);
+
+        setData({ ...jobData, raw_data: rawData });
       } catch (err) {
         setError('Failed to fetch data');
         console.error(err);